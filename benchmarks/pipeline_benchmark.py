@@ -0,0 +1,150 @@
+"""
+pipeline_benchmark.py
+Measures graph building from flight objects when the typed columns produced by
+cleaning (duration minutes, stop counts) are carried on each flight, against
+re-parsing the duration string of every flight in the graph builder.
+Also measures export time and disk use of the graph artifact against the three
+per-algorithm json files, on a synthetic graph since the dataset has only 88 routes.
+
+Usage: python benchmarks/pipeline_benchmark.py [--scale 20] [--input data/flights.csv] [--edges 300000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing.data_processor import FlightDataCleaner, RouteParser, DiscountEngine
+from data_processing.graph_builder import FlightGraph, GraphExporter
+from data_processing.csr_graph import CSRGraph
+from data_processing.models import ProcessedFlight
+from data_processing.config import REALISTIC_DISCOUNTS
+
+
+def load_processed_flights(input_file, scale):
+    """Clean the csv once, repeat the rows `scale` times and apply discounts"""
+    df = pd.read_csv(input_file)
+    cleaned_df, _ = FlightDataCleaner(verbose=False).clean_dataset_vectorized(df)
+    cleaned_df = pd.concat([cleaned_df] * scale, ignore_index=True)
+    flights = RouteParser(verbose=False).convert_to_flight_objects(cleaned_df)
+    return DiscountEngine(REALISTIC_DISCOUNTS, verbose=False).apply_discounts(flights)
+
+
+def without_typed_columns(processed_flights):
+    """Same flights with the cleaned values dropped, as records were built before"""
+    return [
+        ProcessedFlight(
+            original_flight=replace(flight.original_flight, duration_minutes=None, stops_count=None),
+            final_price=flight.final_price
+        )
+        for flight in processed_flights
+    ]
+
+
+def timed(build, repeats):
+    """Run build() `repeats` times and return (last result, best seconds)"""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = build()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def build_graph(processed_flights):
+    """Build a flight graph from a list of processed flights"""
+    flight_graph = FlightGraph(verbose=False)
+    flight_graph.add_flights(processed_flights)
+    return flight_graph
+
+
+def run_benchmark(input_file, scale, repeats):
+    processed_flights = load_processed_flights(input_file, scale)
+    untyped_flights = without_typed_columns(processed_flights)
+    print(f"\nGRAPH BUILD FROM FLIGHT OBJECTS ({len(processed_flights):,} flights, "
+          f"data repeated {scale}x, best of {repeats})\n")
+
+    variants = {
+        're-parse durations (before)': untyped_flights,
+        'typed columns carried': processed_flights,
+    }
+
+    print(f"{'Variant':<30} {'Build (s)':>10} {'Flights/sec':>14}")
+    print("-" * 56)
+    results, exports = {}, {}
+    for name, flights in variants.items():
+        flight_graph, elapsed = timed(lambda: build_graph(flights), repeats)
+        results[name] = elapsed
+        exports[name] = GraphExporter(flight_graph).edge_list_data()
+        print(f"{name:<30} {elapsed:>10.2f} {len(flights) / elapsed:>14,.0f}")
+
+    before = results['re-parse durations (before)']
+    after = results['typed columns carried']
+    same = exports['re-parse durations (before)'] == exports['typed columns carried']
+    print(f"\nCarrying typed columns builds the graph in {after / before:.0%} of the time "
+          f"(identical edges: {same})")
+    return results
+
+
+def synthetic_exporter(city_count, edge_count):
+    """Exporter over a random compiled graph with the given size"""
+    rng = np.random.default_rng(0)
+    return GraphExporter(CSRGraph.from_edges(
+        [f"C{city:04d}" for city in range(city_count)], [None] * city_count,
+        rng.integers(0, city_count, edge_count), rng.integers(0, city_count, edge_count),
+        rng.uniform(500, 20000, edge_count), rng.uniform(500, 20000, edge_count),
+        rng.uniform(500, 20000, edge_count),
+        rng.choice(['IndiGo', 'SpiceJet', 'Air India', 'Vistara'], edge_count).tolist(),
+        rng.integers(60, 1500, edge_count), np.ones(edge_count, dtype=bool), None
+    ))
+
+
+def run_export_benchmark(city_count, edge_count):
+    exporter = synthetic_exporter(city_count, edge_count)
+    print(f"\nGRAPH EXPORT ({city_count:,} cities, {edge_count:,} edges)\n")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        variants = {
+            'three json files (before)': [
+                (exporter.export_for_dijkstra, 'graph_dijkstra.json'),
+                (exporter.export_for_bellman_ford, 'graph_bellman_ford.json'),
+                (exporter.export_edge_list, 'graph_edge_list.json'),
+            ],
+            'graph artifact': [(exporter.export_binary, 'graph.bin')],
+        }
+
+        print(f"{'Variant':<30} {'Export (s)':>10} {'Disk MB':>10}")
+        print("-" * 52)
+        results = {}
+        for name, writers in variants.items():
+            start = time.perf_counter()
+            for write, file_name in writers:
+                write(os.path.join(output_dir, file_name))
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(output_dir, file_name)) for _, file_name in writers)
+            results[name] = (elapsed, size)
+            print(f"{name:<30} {elapsed:>10.2f} {size / 1e6:>10.1f}")
+
+    (json_time, json_size), (artifact_time, artifact_size) = results.values()
+    print(f"\nThe artifact exports {json_time / artifact_time:.0f}x faster "
+          f"and uses {json_size / artifact_size:.1f}x less disk")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark graph building with typed flight columns")
+    parser.add_argument("--input", default="data/flights.csv", help="raw flight csv")
+    parser.add_argument("--scale", type=int, default=20, help="times to repeat the data")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per variant, best is kept")
+    parser.add_argument("--cities", type=int, default=2000, help="cities in the synthetic export graph")
+    parser.add_argument("--edges", type=int, default=300000, help="edges in the synthetic export graph")
+    args = parser.parse_args()
+
+    run_benchmark(args.input, args.scale, args.repeats)
+    run_export_benchmark(args.cities, args.edges)
@@ -0,0 +1,181 @@
+"""
+route_server_load.py
+Load-test client for the route query server: keeps several keep-alive connections
+busy with random city pairs and reports throughput and latency percentiles per
+endpoint. For comparison it also times the same query answered the old way,
+by a fresh Python process that loads the graph file.
+
+By default a server is started on the given graph for the duration of the run;
+pass --no-spawn with --port or --socket to load-test a server that is already running.
+
+Usage: python benchmarks/route_server_load.py [--graph output/graph.bin] [--connections 1]
+       [--requests 5000] [--endpoint all] [--cache-size 0] [--no-spawn --port 8765 | --socket PATH]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing.graph_artifact import GraphArtifact
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SERVER = os.path.join(ROOT, 'src', 'algorithms', 'route_server.py')
+ENDPOINTS = ['dijkstra', 'bellman-ford', 'dp']
+
+
+def make_targets(cities, endpoint, count, seed=0):
+    """`count` request paths over random city pairs, cycling through the endpoints"""
+    rng = random.Random(seed)
+    endpoints = ENDPOINTS if endpoint == 'all' else [endpoint]
+    targets = []
+    for index in range(count):
+        name = endpoints[index % len(endpoints)]
+        source, destination = rng.sample(cities, 2)
+        params = {'source': source, 'destination': destination}
+        if name == 'dp':
+            params['max_stops'] = rng.randint(1, 3)
+        targets.append((name, f"/{name}?{urlencode(params)}"))
+    return targets
+
+
+async def open_connection(port, socket_path):
+    if socket_path:
+        return await asyncio.open_unix_connection(socket_path)
+    return await asyncio.open_connection('127.0.0.1', port)
+
+
+async def request(reader, writer, target):
+    """Send one GET over a keep-alive connection and return (status, body)"""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    length = next(int(line.split(':', 1)[1]) for line in lines if line.lower().startswith('content-length'))
+    return int(lines[0].split(' ')[1]), await reader.readexactly(length)
+
+
+async def run_connection(targets, port, socket_path, latencies):
+    reader, writer = await open_connection(port, socket_path)
+    try:
+        for name, target in targets:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, target)
+            latencies[name].append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"{target} answered {status}")
+    finally:
+        writer.close()
+
+
+async def run_load(targets, connections, port, socket_path):
+    """Spread the targets over the connections and run them all concurrently"""
+    latencies = {name: [] for name in ENDPOINTS}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(targets[index::connections], port, socket_path, latencies)
+                           for index in range(connections)))
+    return latencies, time.perf_counter() - start
+
+
+async def wait_for_server(port, socket_path, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await open_connection(port, socket_path)
+            await request(reader, writer, '/health')
+            writer.close()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            if time.perf_counter() > deadline:
+                raise RuntimeError("Route server did not start")
+            await asyncio.sleep(0.1)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_report(latencies, elapsed, connections):
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{total:,} requests over {connections} connection(s) in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} requests/sec, {elapsed / total * 1e6:.0f}us per request)")
+    # the server answers one request at a time, so latency grows with concurrent connections
+    if connections > 1:
+        print(f"Latency includes waiting behind up to {connections - 1} other connection(s)")
+    print()
+    print(f"{'Endpoint':<14} {'Requests':>9} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    print("-" * 64)
+    for name, values in latencies.items():
+        if values:
+            print(f"{name:<14} {len(values):>9,} {percentile(values, 0.5) * 1000:>9.3f} "
+                  f"{percentile(values, 0.9) * 1000:>9.3f} {percentile(values, 0.99) * 1000:>9.3f} "
+                  f"{max(values) * 1000:>9.3f}")
+
+
+def time_cold_query(graph_file, source, destination, runs):
+    """Best time of answering one query in a fresh process, as every query did before the server"""
+    code = ("import sys; sys.path.insert(0, 'src'); "
+            "from algorithms.dijkstra import find_shortest_path; "
+            f"find_shortest_path({graph_file!r}, {source!r}, {destination!r})")
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(args):
+    graph_file = os.path.abspath(args.graph)
+    cities = GraphArtifact.open(graph_file).nodes
+    targets = make_targets(cities, args.endpoint, args.requests)
+
+    server = None
+    if not args.no_spawn:
+        command = [sys.executable, SERVER, '--graph', graph_file, '--cache-size', str(args.cache_size)]
+        command += ['--socket', args.socket] if args.socket else ['--port', str(args.port)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_server(args.port, args.socket))
+        # one untimed pass over a few queries, so first-visit work is not measured
+        asyncio.run(run_load(targets[:100], 1, args.port, args.socket))
+
+        print(f"\nROUTE SERVER LOAD TEST ({len(cities)} cities, endpoint {args.endpoint}, "
+              f"{'answer cache off' if args.cache_size == 0 else 'answer cache on'})")
+        latencies, elapsed = asyncio.run(run_load(targets, args.connections, args.port, args.socket))
+        print_report(latencies, elapsed, args.connections)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.cold_runs:
+        cold = time_cold_query(graph_file, cities[0], cities[-1], args.cold_runs)
+        served = percentile([value for values in latencies.values() for value in values], 0.5)
+        print(f"\nOne query in a fresh process (before): {cold * 1000:.1f}ms, "
+              f"served median: {served * 1000:.3f}ms ({cold / served:,.0f}x faster)")
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the route query server")
+    parser.add_argument("--graph", default="output/graph.bin", help="graph artifact to serve and pick cities from")
+    parser.add_argument("--connections", type=int, default=1,
+                        help="concurrent keep-alive connections, more raise throughput and latency")
+    parser.add_argument("--requests", type=int, default=5000, help="total requests to send")
+    parser.add_argument("--endpoint", default="all", choices=['all'] + ENDPOINTS, help="endpoint to query")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="answer cache of the spawned server, 0 so every request is searched")
+    parser.add_argument("--port", type=int, default=8765, help="server TCP port")
+    parser.add_argument("--socket", help="server Unix socket path instead of TCP")
+    parser.add_argument("--no-spawn", action="store_true", help="use a server that is already running")
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh-process queries timed for comparison")
+    args = parser.parse_args()
+
+    run_benchmark(args)
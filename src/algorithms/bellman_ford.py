@@ -1,21 +1,29 @@
 """
 Bellman-Ford Algorithm Implementation for Flight Route Optimization
 
-The graph data is available in: ../../output/graph_bellman_ford.json
+The graph data is available in: ../../output/graph.bin, memory-mapped through its edge-array view
 Format: {"nodes": [...], "edges": [[source, dest, weight], ...]}
+Legacy graph_bellman_ford.json files with the same format are still read
 """
 
-import json
+import os
+import sys
 import time
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Sequence, Tuple, Optional
 
-def bellman_ford(nodes: List[str], edges: List[List], start: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+# Add src to Python path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.graph_store import GraphStore, get_default_store
+
+def bellman_ford(nodes: List[str], edges: Iterable[Sequence], start: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
     """
     Bellman-Ford algorithm implementation.
     
     Args:
         nodes: List of node names (cities)
-        edges: List of edges as [source, destination, weight]
+        edges: Edges as [source, destination, weight], iterated once per pass
+            (a list, or a graph artifact's EdgeArrayView)
         start: Starting node
         
     Returns:
@@ -48,24 +56,68 @@ def bellman_ford(nodes: List[str], edges: List[List], start: str) -> Tuple[Dict[
     return distances, predecessors
 
 
-def find_shortest_path(graph_file: str, start: str, end: str) -> Dict:
+def load_graph_data(graph_file: str, profile_id: Optional[str] = None, profiles=None,
+                    store: Optional[GraphStore] = None) -> Dict:
+    """
+    Load the Bellman-Ford graph, or a traveller profile's view of the base-price graph.
+    
+    Args:
+        graph_file: Path to the graph artifact or a legacy graph JSON file
+        profile_id: Traveller profile to price edges for (requires profiles)
+        profiles: ProfileStore holding the base-price graph and profile overlays
+        store: GraphStore caching graph_file (default: the shared store)
+        
+    Returns:
+        Graph data as {"nodes": [...], "edges": [[source, dest, weight], ...]};
+        artifact edges are an iterable view over its mapped arrays, legacy JSON
+        is the store's read-only copy
+        
+    Raises:
+        KeyError: If the profile id is unknown
+    """
+    if profiles is not None:
+        return profiles.overlay(profile_id).bellman_ford_data()
+    
+    # Artifact edges are streamed from its memory-mapped arrays on every pass
+    snapshot = (store or get_default_store()).get(graph_file)
+    if snapshot.is_artifact:
+        return {'nodes': snapshot.graph.nodes, 'edges': snapshot.view('edge_arrays')}
+    return snapshot.graph
+
+
+def find_shortest_path(graph_file: str, start: str, end: str,
+                       profile_id: Optional[str] = None, profiles=None,
+                       store: Optional[GraphStore] = None) -> Dict:
     """
     Find shortest path between two cities using Bellman-Ford algorithm.
     
     Args:
-        graph_file: Path to the graph JSON file
+        graph_file: Path to the graph artifact or a legacy graph JSON file
         start: Starting city code
         end: Destination city code
+        profile_id: Traveller profile to price the route for (requires profiles)
+        profiles: ProfileStore holding the base-price graph and profile overlays;
+            when given, the graph comes from the store instead of graph_file
+        store: GraphStore caching graph_file (default: the shared store)
         
     Returns:
-        Dictionary containing path details and metrics
+        Dictionary containing path details and metrics; execution_time is split
+        into load_time (getting the graph) and search_time
     """
     start_time = time.time()
     
     # Load graph data
-    with open(graph_file, 'r') as f:
-        graph_data = json.load(f)
+    try:
+        graph_data = load_graph_data(graph_file, profile_id, profiles, store)
+    except KeyError as e:
+        return {
+            'path': None,
+            'cost': float('inf'),
+            'error': e.args[0],
+            'execution_time': time.time() - start_time
+        }
     
+    load_time = time.time() - start_time
     nodes = graph_data['nodes']
     edges = graph_data['edges']
     
@@ -115,6 +167,8 @@ def find_shortest_path(graph_file: str, start: str, end: str) -> Dict:
             'cost': distances[end],
             'stops': len(path) - 1,
             'execution_time': execution_time,
+            'load_time': load_time,
+            'search_time': execution_time - load_time,
             'algorithm': 'Bellman-Ford'
         }
         
@@ -127,13 +181,18 @@ def find_shortest_path(graph_file: str, start: str, end: str) -> Dict:
         }
 
 
-def analyze_all_routes_from_city(graph_file: str, start: str) -> Dict:
+def analyze_all_routes_from_city(graph_file: str, start: str,
+                                 profile_id: Optional[str] = None, profiles=None,
+                                 store: Optional[GraphStore] = None) -> Dict:
     """
     Find shortest paths from a city to all other cities.
     
     Args:
-        graph_file: Path to the graph JSON file
+        graph_file: Path to the graph artifact or a legacy graph JSON file
         start: Starting city code
+        profile_id: Traveller profile to price the routes for (requires profiles)
+        profiles: ProfileStore holding the base-price graph and profile overlays
+        store: GraphStore caching graph_file (default: the shared store)
         
     Returns:
         Dictionary with routes to all reachable cities
@@ -141,9 +200,15 @@ def analyze_all_routes_from_city(graph_file: str, start: str) -> Dict:
     start_time = time.time()
     
     # Load graph data
-    with open(graph_file, 'r') as f:
-        graph_data = json.load(f)
+    try:
+        graph_data = load_graph_data(graph_file, profile_id, profiles, store)
+    except KeyError as e:
+        return {
+            'error': e.args[0],
+            'execution_time': time.time() - start_time
+        }
     
+    load_time = time.time() - start_time
     nodes = graph_data['nodes']
     edges = graph_data['edges']
     
@@ -184,11 +249,14 @@ def analyze_all_routes_from_city(graph_file: str, start: str) -> Dict:
                     'stops': len(path) - 1
                 }
         
+        execution_time = time.time() - start_time
         return {
             'source': start,
             'routes': routes,
             'total_reachable': sum(1 for r in routes.values() if r['reachable']),
-            'execution_time': time.time() - start_time
+            'execution_time': execution_time,
+            'load_time': load_time,
+            'search_time': execution_time - load_time
         }
         
     except ValueError as e:
@@ -203,7 +271,7 @@ def compare_routes(graph_file: str, routes_to_test: List[Tuple[str, str]]) -> Li
     Compare multiple routes for benchmarking.
     
     Args:
-        graph_file: Path to the graph JSON file
+        graph_file: Path to the graph artifact or a legacy graph JSON file
         routes_to_test: List of (source, destination) tuples
         
     Returns:
@@ -221,7 +289,7 @@ def compare_routes(graph_file: str, routes_to_test: List[Tuple[str, str]]) -> Li
 
 if __name__ == "__main__":
     # Path to the graph file
-    graph_file = "output/graph_bellman_ford.json"
+    graph_file = "output/graph.bin"
     
     print("=== Bellman-Ford Algorithm for Flight Route Optimization ===\n")
     
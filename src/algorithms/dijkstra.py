@@ -2,8 +2,9 @@
 Dijkstra Algorithm Implementation for Flight Route Optimization
 Updated to work with processed flight data and discount system
 
-The graph data is available in: graph_dijkstra.json
+The graph data is available in: output/graph.bin, memory-mapped through its adjacency view
 Format: {source_city: {dest_city: discounted_weight, ...}, ...}
+Legacy graph_dijkstra.json files with the same format are still read
 
 Key Points:
 - All weights are post-discount prices (IndiGo 15%, Jet Airways 20%, Credit Card ₹1000, Seasonal 25%)
@@ -12,10 +13,16 @@ Key Points:
 - Expected routes: BLR→DEL (₹2,265), BOM→HYD (₹883.50), etc.
 """
 
-import json
 import heapq
+import os
+import sys
 import time
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Tuple, Optional
+
+# Add src to Python path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.graph_store import GraphStore, get_default_store
 
 def dijkstra(graph: Dict, start: str) -> Tuple[Dict[str, float], Dict[str, str]]:
     """
@@ -55,23 +62,58 @@ def dijkstra(graph: Dict, start: str) -> Tuple[Dict[str, float], Dict[str, str]]
     
     return distances, predecessors
 
-def find_shortest_path(graph_file: str, start: str, end: str) -> Dict:
+def load_graph(graph_file: str, store: Optional[GraphStore] = None) -> Mapping:
+    """
+    Load the Dijkstra adjacency list, reusing the store's snapshot while the file is unchanged.
+    
+    Args:
+        graph_file: Path to the graph artifact or a legacy graph_dijkstra.json
+        store: GraphStore to load through (default: the shared store)
+        
+    Returns:
+        Read-only {source_city: {dest_city: weight}} mapping; for an artifact this is
+        its adjacency view, whose rows are read from the mapped arrays when looked up
+    """
+    snapshot = (store or get_default_store()).get(graph_file)
+    return snapshot.view('adjacency') if snapshot.is_artifact else snapshot.graph
+
+def find_shortest_path(graph_file: str, start: str, end: str,
+                       profile_id: Optional[str] = None, profiles=None,
+                       store: Optional[GraphStore] = None) -> Dict:
     """
     Find shortest path between two cities using Dijkstra on discounted weights.
     
     Args:
-        graph_file: Path to graph_dijkstra.json
+        graph_file: Path to the graph artifact or a legacy graph_dijkstra.json
         start: Starting city code
         end: Destination city code
+        profile_id: Traveller profile to price the route for (requires profiles)
+        profiles: ProfileStore holding the base-price graph and profile overlays;
+            when given, the graph comes from the store instead of graph_file
+        store: GraphStore caching graph_file (default: the shared store)
         
     Returns:
-        Dictionary containing path details and metrics
+        Dictionary containing path details and metrics; execution_time is split
+        into load_time (getting the graph) and search_time
     """
     start_time = time.time()
     
-    # Load processed graph data
-    with open(graph_file, 'r') as f:
-        graph = json.load(f)
+    if profiles is not None:
+        # Base-price graph with the traveller's discounts overlaid
+        try:
+            graph = profiles.overlay(profile_id).dijkstra_data()
+        except KeyError as e:
+            return {
+                'path': None,
+                'cost': float('inf'),
+                'error': e.args[0],
+                'execution_time': time.time() - start_time,
+                'algorithm': 'Dijkstra'
+            }
+    else:
+        # Load processed graph data, cached after the first call
+        graph = load_graph(graph_file, store)
+    load_time = time.time() - start_time
     
     # Validate input cities
     if start not in graph:
@@ -121,6 +163,8 @@ def find_shortest_path(graph_file: str, start: str, end: str) -> Dict:
         'cost': distances[end],
         'stops': len(path) - 1,
         'execution_time': execution_time,
+        'load_time': load_time,
+        'search_time': execution_time - load_time,
         'algorithm': 'Dijkstra',
         'note': 'Uses pre-discounted weights from data processing'
     }
@@ -165,8 +209,7 @@ def analyze_discount_impact(graph_file: str):
     """
     print("=== Discount System Analysis ===\n")
     
-    with open(graph_file, 'r') as f:
-        graph = json.load(f)
+    graph = load_graph(graph_file)
     
     all_weights = []
     for city_routes in graph.values():
@@ -199,8 +242,8 @@ def analyze_discount_impact(graph_file: str):
         print(f"   These likely have minimal applicable discounts")
 
 if __name__ == "__main__":
-    # Use the updated graph file
-    graph_file = "graph_dijkstra.json"
+    # Use the graph artifact written by process_data.py
+    graph_file = "output/graph.bin"
     
     print("🚀 Dijkstra Algorithm - Updated with Latest Data")
     print("="*60)
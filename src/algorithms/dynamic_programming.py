@@ -1,14 +1,83 @@
 """
 Dynamic Programming Algorithm Implementation for Flight Route Optimization
-The graph data is available in: ../../output/graph_edge_list.json
-Format: [{"source": "...", "destination": "...", "weight": ..., "price": ..., "airline": ..., ...}, ...]
+The graph data is available in: ../../output/graph.bin, memory-mapped through its attributed adjacency view
+Format: {"source": [{"source": "...", "destination": "...", "weight": ..., "price": ..., "airline": ..., ...}, ...], ...}
+Edge lists in the legacy graph_edge_list.json format (or its ndjson variant, one edge per line) are still accepted
 """
 import json
+import os
+import re
+import sys
 from collections import defaultdict
+from collections.abc import Mapping
+
+# Add src to Python path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from data_processing.graph_artifact import GraphArtifact, is_graph_artifact
+from algorithms.graph_store import get_default_store
+
+# Cost multiplier for flights outside the preferred airlines
+NON_PREFERRED_PENALTY = 1.15
+
+# Characters read from an edge list file at a time while streaming
+READ_CHUNK_SIZE = 1 << 16
+
+# Whitespace and array separators between streamed records
+_RECORD_GAP = re.compile(r'[\s,]*')
 
 def load_edge_data(filepath='output/graph_edge_list.json'):
+    # Binary artifacts are memory-mapped and their edges read from the arrays
+    if is_graph_artifact(filepath):
+        return GraphArtifact.open(filepath).edge_list()
+    return list(iter_edge_data(filepath))
+
+# Yield edges one at a time from a json array or ndjson edge list file, holding only
+# about READ_CHUNK_SIZE characters of it in memory; feeds build_graph_from_edges directly
+def iter_edge_data(filepath='output/graph_edge_list.json'):
+    decoder = json.JSONDecoder()
     with open(filepath, 'r') as f:
-        return json.load(f)
+        buffer = f.read(READ_CHUNK_SIZE)
+        position = 0
+        in_array = None     # decided by the first character that is not whitespace
+        at_eof = False
+        
+        while True:
+            position = _RECORD_GAP.match(buffer, position).end()
+            if in_array is None and position < len(buffer):
+                in_array = buffer[position] == '['
+                position += in_array
+                continue
+            if in_array and buffer.startswith(']', position):
+                return
+            
+            # a record may continue past the buffer (a number can even parse early), so it
+            # only counts once it parses and a separator follows it, or the file has ended
+            if position < len(buffer):
+                try:
+                    edge, end = decoder.raw_decode(buffer, position)
+                    if at_eof or (end < len(buffer) and buffer[end] in ' \t\n\r,]'):
+                        yield edge
+                        position = end
+                        continue
+                except json.JSONDecodeError:
+                    if at_eof:
+                        raise
+            elif at_eof:
+                if in_array:
+                    raise ValueError(f"Unterminated edge list in {filepath}")
+                return
+            
+            # drop what was consumed and read the next chunk
+            more = f.read(READ_CHUNK_SIZE)
+            buffer = buffer[position:] + more
+            position = 0
+            at_eof = not more
+
+# DP graph straight from the artifact: per-city edge lists, built on first visit.
+# The graph store maps the file once, so repeated calls share the same rows
+def load_graph(filepath='output/graph.bin', store=None):
+    return (store or get_default_store()).get(filepath).view('attributed_adjacency')
 
 def build_graph_from_edges(edges):
     graph = defaultdict(list)
@@ -21,9 +90,34 @@ def build_graph_from_edges(edges):
     
     return graph, sorted(list(cities))
 
-def dp_shortest_path(edges, start, end, constraints=None):
-    # Build the graph
-    graph, cities = build_graph_from_edges(edges)
+def dp_shortest_path(edges, start, end, constraints=None, profile_id=None, profiles=None, fares=None):
+    # Price edges for a traveller profile: the store's base-price edges with its discounts overlaid
+    if profiles is not None:
+        try:
+            edges = profiles.overlay(profile_id).edge_list_data()
+        except KeyError as e:
+            return {
+                'path': None,
+                'total_cost': float('inf'),
+                'error': e.args[0],
+                'algorithm': 'Dynamic Programming'
+            }
+    
+    # With a fare index (FlightGraph(keep_all_fares=True).fares) every leg uses its cheapest
+    # fare allowed by the airline constraints, instead of the one cheapest fare per leg
+    if fares is not None:
+        airline_constraints = constraints or {}
+        edges = fares.edge_list_data(
+            airline_constraints.get('preferred_airlines', []),
+            airline_constraints.get('avoid_airlines', []),
+            NON_PREFERRED_PENALTY
+        )
+    
+    # An attributed adjacency view already is the graph, edge lists are built into one
+    if isinstance(edges, Mapping):
+        graph, cities = edges, sorted(edges)
+    else:
+        graph, cities = build_graph_from_edges(edges)
     
     if constraints is None:
         constraints = {}
@@ -61,7 +155,7 @@ def dp_shortest_path(edges, start, end, constraints=None):
                 # Calculate cost with preference penalty
                 flight_cost = flight['weight']
                 if preferred_airlines and airline not in preferred_airlines:
-                    flight_cost *= 1.15  # 15% penalty for non-preferred airlines
+                    flight_cost *= NON_PREFERRED_PENALTY  # 15% penalty for non-preferred airlines
                 
                 new_cost = current_cost + flight_cost
                 new_duration = current_duration + flight['duration_minutes']
@@ -130,8 +224,8 @@ def print_route(result):
 
 # Testing
 if __name__ == "__main__":
-    edges = load_edge_data()
-    print(f"Loaded {len(edges)} flights\n")
+    edges = load_graph()
+    print(f"Loaded {sum(len(edges[city]) for city in edges)} flights\n")
     
     # Test basic path
     print("Test 1: BLR to DEL")
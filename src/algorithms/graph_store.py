@@ -0,0 +1,236 @@
+"""
+Graph Store for the Flight Route Algorithms
+
+Loads each graph file once and hands out read-only snapshots of it, so repeated
+queries (compare_routes, comparison_analysis.py) search instead of re-reading files.
+
+- A file is reloaded only when its mtime or size changes and its content hash differs;
+  artifacts are hashed only to confirm a same-size change, never on a first load
+- Binary artifacts are memory-mapped; JSON files are parsed once and frozen read-only
+- Every snapshot records how long its load took, separately from any search on it
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Optional
+
+# Add src to Python path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from data_processing.graph_artifact import HASH_BLOCK_SIZE, GraphArtifact, is_graph_artifact
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """
+    One loaded version of a graph file. Snapshots never change; a reload
+    produces a new snapshot and earlier ones stay valid for their holders.
+    
+    Attributes:
+        path: Graph file the snapshot was loaded from
+        graph: GraphArtifact for binary artifacts, else the parsed JSON with
+            dicts frozen into read-only mappings and lists into tuples
+        mtime_ns: File modification time when loaded
+        size: File size in bytes when loaded
+        sha256: Hash of the file content; None for an artifact that has not been
+            hashed, since artifacts are only hashed to confirm a same-size change
+        load_time: Seconds spent mapping or parsing the file
+        version: 1 for the first load of a path, incremented on every reload
+    """
+    path: str
+    graph: Any
+    mtime_ns: int
+    size: int
+    sha256: Optional[str]
+    load_time: float
+    version: int
+    _views: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    
+    @property
+    def is_artifact(self) -> bool:
+        return isinstance(self.graph, GraphArtifact)
+    
+    def view(self, name: str) -> Any:
+        """
+        Per-algorithm view of an artifact snapshot, created once and shared.
+        
+        Args:
+            name: GraphArtifact view method: 'adjacency', 'edge_arrays' or 'attributed_adjacency'
+        
+        Returns:
+            The view over this snapshot's arrays
+        """
+        if name not in self._views:
+            self._views[name] = getattr(self.graph, name)()
+        return self._views[name]
+
+
+class GraphStore:
+    """
+    Thread-safe cache of graph snapshots keyed by file path.
+    
+    Args:
+        auto_reload: Check the file on every get (default). When False, get serves
+            the cached snapshot as-is and only reload picks up file changes, so a
+            long-running caller decides when new versions are swapped in
+        expect_artifact: Refuse files that are not graph artifacts, so a JSON file
+            published at an artifact path never replaces the last good snapshot
+    """
+    
+    def __init__(self, auto_reload: bool = True, expect_artifact: bool = False):
+        self.auto_reload = auto_reload
+        self.expect_artifact = expect_artifact
+        self._snapshots: Dict[str, GraphSnapshot] = {}
+        self._lock = threading.Lock()
+        self.loads = 0      # files actually read, for checking reuse
+    
+    def get(self, path: str) -> GraphSnapshot:
+        """
+        Current snapshot of a graph file, loading or reloading it only if needed.
+        
+        Args:
+            path: Path to a graph artifact or a graph JSON file
+        
+        Returns:
+            The cached snapshot while the file is unchanged, otherwise a fresh one
+        
+        Raises:
+            OSError: If the file cannot be read and no snapshot of it is cached
+            ValueError: If the file cannot be parsed and no snapshot of it is cached
+        """
+        if not self.auto_reload:
+            snapshot = self._snapshots.get(os.path.abspath(path))
+            if snapshot is not None:
+                return snapshot
+        return self.reload(path)
+    
+    def reload(self, path: str) -> GraphSnapshot:
+        """
+        Check a graph file and load it again if it changed since its snapshot.
+        
+        Args:
+            path: Path to a graph artifact or a graph JSON file
+        
+        Returns:
+            The new snapshot if the file changed, otherwise the cached one
+        
+        Raises:
+            OSError: If the file cannot be read and no snapshot of it is cached
+            ValueError: If the file cannot be parsed and no snapshot of it is cached
+        """
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            # Between an exporter's unlink and rename, keep the last good snapshot
+            if key not in self._snapshots:
+                raise
+            return self._snapshots[key]
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and (snapshot.mtime_ns, snapshot.size) == (stat.st_mtime_ns, stat.st_size):
+            return snapshot
+        
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            try:
+                stat = os.stat(key)
+            except OSError:
+                if snapshot is None:
+                    raise
+                return snapshot
+            if snapshot is not None and (snapshot.mtime_ns, snapshot.size) == (stat.st_mtime_ns, stat.st_size):
+                return snapshot
+            
+            try:
+                new_snapshot = self._load(key, stat, snapshot)
+            except (OSError, ValueError):
+                # A file caught mid-write keeps serving the last good snapshot
+                if snapshot is None:
+                    raise
+                return snapshot
+            self._snapshots[key] = new_snapshot
+            return new_snapshot
+    
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Forget one cached file, or all of them, so the next get reloads.
+        
+        Args:
+            path: Graph file to forget; None forgets every file
+        """
+        with self._lock:
+            if path is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(os.path.abspath(path), None)
+    
+    def _load(self, path: str, stat: os.stat_result, previous: Optional[GraphSnapshot]) -> GraphSnapshot:
+        if self.expect_artifact and not is_graph_artifact(path):
+            raise ValueError(f"{path} is not a graph artifact")
+        
+        # A new size is always a new file; with the same size, hash both versions to tell
+        # an edit from a touch. Artifacts hash their old content from the mapping
+        content_hash = None
+        if previous is not None and previous.size == stat.st_size:
+            previous_hash = previous.sha256
+            if previous_hash is None and previous.is_artifact:
+                previous_hash = previous.graph.sha256()
+            content_hash = _file_sha256(path)
+            # Touched but unchanged: keep the loaded graph, just record the new file state
+            if previous_hash == content_hash:
+                return GraphSnapshot(path, previous.graph, stat.st_mtime_ns, stat.st_size, content_hash,
+                                     previous.load_time, previous.version, previous._views)
+        
+        start_time = time.perf_counter()
+        if is_graph_artifact(path):
+            graph = GraphArtifact.open(path)
+        else:
+            # JSON is read whole to parse it anyway, so its hash comes for free
+            with open(path, 'rb') as f:
+                content = f.read()
+            content_hash = hashlib.sha256(content).hexdigest()
+            graph = _freeze(json.loads(content))
+        self.loads += 1
+        return GraphSnapshot(path, graph, stat.st_mtime_ns, stat.st_size, content_hash,
+                             time.perf_counter() - start_time, previous.version + 1 if previous else 1)
+
+
+def _file_sha256(path: str) -> str:
+    # Read in blocks, so a large artifact is never held on the heap whole
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _freeze(value: Any) -> Any:
+    # Read-only copy of parsed JSON: dicts become mappings, lists become tuples
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Store shared by the algorithm modules
+_default_store: Optional[GraphStore] = None
+
+
+def get_default_store() -> GraphStore:
+    """
+    Process-wide graph store used when no store is passed to an algorithm.
+    
+    Returns:
+        The shared GraphStore
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = GraphStore()
+    return _default_store
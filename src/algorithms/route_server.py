@@ -0,0 +1,370 @@
+"""
+Route Query Server for Flight Route Optimization
+
+Long-running asyncio server that keeps the graph artifact (output/graph.bin) mapped
+in memory and answers route queries over HTTP/1.1, on a TCP port or a Unix socket,
+so a query costs one search instead of a Python start-up and a file load.
+
+Endpoints (GET, JSON responses):
+- /dijkstra?source=BLR&destination=DEL        shortest path
+- /bellman-ford?source=BLR&destination=DEL    shortest path allowing negative weights
+- /dp?source=BLR&destination=DEL&max_stops=2&budget=6000&max_duration=600
+      &preferred_airlines=IndiGo,Vistara&avoid_airlines=SpiceJet
+                                              constrained path (dp_shortest_path)
+- /health                                     loaded graph version and size
+- /reload (POST)                              check the graph file now
+
+Hot reload: the file is checked every --reload-interval seconds (and on SIGHUP) in a
+worker thread. A changed artifact is mapped as a new snapshot and swapped in between
+requests; process_data.py replaces graph.bin atomically, so the previous mapping
+stays valid until the swap. Answers are cached per snapshot.
+
+Usage: python src/algorithms/route_server.py [--graph output/graph.bin] [--port 8765 | --socket PATH]
+       [--reload-interval 1.0] [--cache-size 65536]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Add src to Python path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.graph_store import GraphStore
+from algorithms import bellman_ford, dijkstra
+from algorithms.dynamic_programming import dp_shortest_path, load_graph
+from data_processing.graph_artifact import is_graph_artifact
+
+# Distinct answers cached per graph snapshot
+ANSWER_CACHE_SIZE = 65536
+
+# Largest request head accepted, in bytes
+MAX_HEADER_SIZE = 16384
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+class RouteService:
+    """
+    Answers route queries against the current snapshot of one graph artifact.
+    
+    Args:
+        graph_file: Path to the graph artifact
+        cache_size: Distinct answers cached per snapshot (0 disables caching)
+    
+    Raises:
+        ValueError: If graph_file is not a graph artifact
+    """
+    
+    def __init__(self, graph_file: str, cache_size: int = ANSWER_CACHE_SIZE):
+        self.graph_file = graph_file
+        self.cache_size = cache_size
+        # Only the watcher swaps snapshots in, requests never touch the file, and the
+        # store never takes a non-artifact file as its current snapshot
+        self.store = GraphStore(auto_reload=False, expect_artifact=True)
+        self._check_file()
+        self.snapshot = self.store.get(graph_file)
+        self._answer = self._new_cache()
+        self.requests = 0
+    
+    def _check_file(self) -> None:
+        # Says why a reload is refused; the store refuses it regardless
+        if not is_graph_artifact(self.graph_file):
+            raise ValueError(f"{self.graph_file} is not a graph artifact, run process_data.py first")
+    
+    def _new_cache(self):
+        return lru_cache(maxsize=self.cache_size)(self._compute) if self.cache_size else self._compute
+    
+    def reload(self) -> bool:
+        """
+        Check the graph file and swap in a new snapshot if it changed.
+        Safe to call from a worker thread.
+        
+        Returns:
+            True if a new snapshot was swapped in
+        
+        Raises:
+            OSError: If the graph file cannot be read
+            ValueError: If the graph file is not a graph artifact
+        """
+        self._check_file()
+        snapshot = self.store.reload(self.graph_file)
+        if snapshot is self.snapshot or snapshot.graph is self.snapshot.graph:
+            self.snapshot = snapshot
+            return False
+        
+        # Swap the cache first: an answer from the old graph must not outlive it
+        self._answer = self._new_cache()
+        self.snapshot = snapshot
+        return True
+    
+    def health(self) -> Dict:
+        snapshot = self.snapshot
+        return {
+            'graph': snapshot.path,
+            'version': snapshot.version,
+            'sha256': snapshot.sha256,
+            'nodes': snapshot.graph.number_of_nodes(),
+            'edges': snapshot.graph.number_of_edges(),
+            'load_time': snapshot.load_time,
+            'requests': self.requests
+        }
+    
+    def query(self, endpoint: str, params: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Answer one route query.
+        
+        Args:
+            endpoint: 'dijkstra', 'bellman-ford' or 'dp'
+            params: Query parameters, source and destination are required
+        
+        Returns:
+            Tuple of (HTTP status, JSON response body)
+        """
+        self.requests += 1
+        try:
+            source, destination = params['source'], params['destination']
+            # A simple path has at most one stop fewer than there are cities
+            max_stops = self.snapshot.graph.number_of_nodes() - 1
+            constraints = _parse_constraints(params, max_stops) if endpoint == 'dp' else ()
+        except KeyError as e:
+            return 400, _encode({'error': f"Missing parameter {e.args[0]}"})
+        except ValueError as e:
+            return 400, _encode({'error': str(e)})
+        return 200, self._answer(endpoint, source, destination, constraints)
+    
+    def _compute(self, endpoint: str, source: str, destination: str, constraints: Tuple) -> bytes:
+        # The service's store always returns the current snapshot without touching the file
+        version = self.store.get(self.graph_file).version
+        if endpoint == 'dijkstra':
+            result = dijkstra.find_shortest_path(self.graph_file, source, destination, store=self.store)
+        elif endpoint == 'bellman-ford':
+            result = bellman_ford.find_shortest_path(self.graph_file, source, destination, store=self.store)
+        else:
+            start_time = time.time()
+            result = dp_shortest_path(load_graph(self.graph_file, self.store), source, destination,
+                                      dict(constraints))
+            result['search_time'] = time.time() - start_time
+        result['graph_version'] = version
+        return _encode(result)
+
+
+def _parse_constraints(params: Dict[str, str], max_stops: int) -> Tuple:
+    # Hashable form of the dp constraints, so answers can be cached by them.
+    # max_stops is clamped to the graph's limit, the DP runs one round per stop
+    constraints = []
+    for name, convert in (('max_stops', int), ('max_duration', float), ('budget', float)):
+        if name in params:
+            try:
+                value = convert(params[name])
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {params[name]}")
+            if name == 'max_stops':
+                if value < 0:
+                    raise ValueError(f"Invalid max_stops: {value}")
+                value = min(value, max_stops)
+            constraints.append((name, value))
+    for name in ('preferred_airlines', 'avoid_airlines'):
+        if name in params:
+            constraints.append((name, tuple(airline for airline in params[name].split(',') if airline)))
+    return tuple(constraints)
+
+
+def _encode(result: Dict) -> bytes:
+    # Unreachable costs are infinite, which JSON cannot represent
+    return json.dumps({key: None if isinstance(value, float) and math.isinf(value) else value
+                       for key, value in result.items()}).encode()
+
+
+def _response(status: int, body: bytes, keep_alive: bool) -> bytes:
+    head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+class RouteServer:
+    """
+    HTTP/1.1 front end of a RouteService with keep-alive connections and hot reload.
+    
+    Args:
+        service: RouteService answering the queries
+        reload_interval: Seconds between graph file checks (0 disables polling)
+    """
+    
+    def __init__(self, service: RouteService, reload_interval: float = 1.0):
+        self.service = service
+        self.reload_interval = reload_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reloading: Optional[asyncio.Task] = None
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8765,
+                    socket_path: Optional[str] = None) -> None:
+        if socket_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=socket_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+    
+    async def serve_forever(self) -> None:
+        watcher = asyncio.create_task(self._watch()) if self.reload_interval > 0 else None
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+    
+    def close(self) -> None:
+        self._server.close()
+    
+    async def reload(self) -> bool:
+        """
+        Check the graph file in a worker thread, so hashing and mapping a new
+        artifact never stalls requests being answered from the current one.
+        
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        # A reload already running covers this request too
+        if self._reloading is None or self._reloading.done():
+            self._reloading = asyncio.ensure_future(asyncio.to_thread(self.service.reload))
+        try:
+            reloaded = await asyncio.shield(self._reloading)
+        except (OSError, ValueError) as e:
+            print(f"Reload failed, still serving version {self.service.snapshot.version}: {e}")
+            return False
+        if reloaded:
+            snapshot = self.service.snapshot
+            print(f"Reloaded {snapshot.path}: version {snapshot.version}, "
+                  f"{snapshot.graph.number_of_edges():,} edges in {snapshot.load_time * 1000:.1f}ms")
+        return reloaded
+    
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload()
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, keep_alive = request
+                try:
+                    status, body = await self._dispatch(method, target)
+                except Exception as e:
+                    # A failed query still gets an answer, the connection stays usable
+                    print(f"Error answering {method} {target}: {e!r}")
+                    status, body = 500, _encode({'error': f"Internal error: {e}"})
+                writer.write(_response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bool]]:
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise
+            return None     # client closed the connection between requests
+        if len(head) > MAX_HEADER_SIZE:
+            raise ValueError("Request head too large")
+        
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        method, target, version = request_line.split(' ', 2)
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+        
+        # Bodies are not used by any endpoint, but must be consumed to keep the stream in step
+        length = int(headers.get('content-length', 0))
+        if length:
+            await reader.readexactly(length)
+        
+        connection = headers.get('connection', '')
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, target, keep_alive
+    
+    async def _dispatch(self, method: str, target: str) -> Tuple[int, bytes]:
+        url = urlsplit(target)
+        endpoint = url.path.strip('/')
+        
+        if endpoint == 'reload':
+            if method != 'POST':
+                return 405, _encode({'error': "Use POST /reload"})
+            reloaded = await self.reload()
+            return 200, _encode({'reloaded': reloaded, **self.service.health()})
+        if method != 'GET':
+            return 405, _encode({'error': f"Use GET /{endpoint}"})
+        if endpoint == 'health':
+            return 200, _encode(self.service.health())
+        if endpoint not in ('dijkstra', 'bellman-ford', 'dp'):
+            return 404, _encode({'error': f"Unknown endpoint /{endpoint}"})
+        
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return self.service.query(endpoint, params)
+
+
+async def run_server(graph_file: str, host: str, port: int, socket_path: Optional[str],
+                     reload_interval: float, cache_size: int = ANSWER_CACHE_SIZE) -> None:
+    server = RouteServer(RouteService(graph_file, cache_size), reload_interval)
+    await server.start(host, port, socket_path)
+    
+    # SIGHUP checks the graph now, SIGINT/SIGTERM stop accepting and exit
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+    loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(server.reload()))
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, main_task.cancel)
+    
+    health = server.service.health()
+    print(f"Serving {health['graph']} (version {health['version']}, {health['nodes']} cities, "
+          f"{health['edges']:,} edges) on {socket_path or f'http://{host}:{port}'}")
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        server.close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("Route server stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve flight route queries from an in-memory graph")
+    parser.add_argument("--graph", default="output/graph.bin", help="graph artifact written by process_data.py")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="seconds between graph file checks, 0 to reload only on SIGHUP or POST /reload")
+    parser.add_argument("--cache-size", type=int, default=ANSWER_CACHE_SIZE,
+                        help="distinct answers cached per graph version, 0 to search on every request")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run_server(args.graph, args.host, args.port, args.socket, args.reload_interval,
+                               args.cache_size))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,97 @@
+# on-disk cache of parsed flight tables, so an unchanged input skips cleaning and parsing.
+# tables are stored as uncompressed npz files: one typed array per column and
+# fixed-width unicode arrays for the vocabularies, no pickling involved
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional
+import numpy as np
+from .models import City, Discount, FlightTable
+from .city_registry import CityRegistry, get_default_registry
+from .config import CITY_CODE_TO_NAME, CITY_NAME_MAPPINGS, REALISTIC_DISCOUNTS
+
+# bump when the FlightTable layout or the cleaning rules change
+CACHE_FORMAT_VERSION = 1
+
+# FlightTable fields stored as plain arrays
+_ARRAY_FIELDS: List[str] = [
+    f.name for f in fields(FlightTable)
+    if f.name not in ('airlines', 'cities', 'dates', 'duration_texts', 'infos', 'final_prices')
+]
+_STRING_FIELDS: List[str] = ['airlines', 'dates', 'duration_texts', 'infos']
+
+
+# cache of parsed (not yet discounted) flight tables, one file per input content hash
+class FlightTableCache:
+
+    def __init__(self, cache_dir: str, city_mappings: Dict[str, str] = None,
+                 discounts: List[Discount] = None, registry: CityRegistry = None):
+        self.cache_dir = cache_dir
+        self.city_mappings = city_mappings or CITY_NAME_MAPPINGS
+        self.discounts = discounts or REALISTIC_DISCOUNTS
+        self.registry = registry or get_default_registry()
+    
+    # hash of the input bytes plus every config value that shapes the parsed table
+    def cache_key(self, input_file: str) -> str:
+        digest = hashlib.sha256()
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        
+        config = {
+            'version': CACHE_FORMAT_VERSION,
+            'city_mappings': self.city_mappings,
+            'city_codes': CITY_CODE_TO_NAME,
+            'discounts': [asdict(discount) for discount in self.discounts]
+        }
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+    
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"flights_{key[:32]}.npz")
+    
+    # load the cached table for an input's cache_key, or None on a miss
+    def load(self, key: str) -> Optional[FlightTable]:
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in _ARRAY_FIELDS}
+            strings = {name: data[name].tolist() for name in _STRING_FIELDS}
+            
+            # cities go back through the registry so they stay shared
+            cities = [
+                self.registry.intern(City(code=code, name=name, normalized_name=normalized_name))
+                for code, name, normalized_name in zip(
+                    data['city_codes'].tolist(), data['city_names'].tolist(),
+                    data['city_normalized_names'].tolist()
+                )
+            ]
+        
+        return FlightTable(cities=cities, **columns, **strings)
+    
+    # save a parsed table under an input's cache_key, written atomically
+    def store(self, key: str, table: FlightTable) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        
+        arrays = {name: getattr(table, name) for name in _ARRAY_FIELDS}
+        arrays.update({name: _string_array(getattr(table, name)) for name in _STRING_FIELDS})
+        arrays['city_codes'] = _string_array([city.code for city in table.cities])
+        arrays['city_names'] = _string_array([city.name for city in table.cities])
+        arrays['city_normalized_names'] = _string_array([city.normalized_name for city in table.cities])
+        
+        # write to a temp file first so readers never see a partial cache entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+        return path
+
+
+# fixed-width unicode array, so np.load never needs pickle
+def _string_array(values: List[str]) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.array([], dtype='<U1')
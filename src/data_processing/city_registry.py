@@ -0,0 +1,83 @@
+from typing import Dict, Optional
+from .models import City
+from .utils import normalize_city_name
+from .config import CITY_CODE_TO_NAME, CITY_NAME_MAPPINGS
+
+
+# shared lookup table for cities, hands out one City object per airport code
+class CityRegistry:
+
+    def __init__(self, city_mappings: Dict[str, str] = None, city_codes: Dict[str, str] = None):
+        # use provided mappings or default ones from config
+        self.city_mappings = city_mappings or CITY_NAME_MAPPINGS
+        self.city_codes = city_codes or CITY_CODE_TO_NAME
+        
+        # reverse index: lowercase city name -> airport code.
+        # first code wins, same as scanning city_codes in order
+        self.name_to_code: Dict[str, str] = {}
+        for code, name in self.city_codes.items():
+            self.name_to_code.setdefault(name.lower(), code)
+        
+        self._cities_by_code: Dict[str, City] = {}       # canonical city per airport code
+        self._cities_by_identifier: Dict[str, City] = {} # any name or code seen so far
+    
+    # get the canonical city for a city name or airport code
+    def get_city(self, city_identifier: str) -> City:
+        city = self._cities_by_identifier.get(city_identifier)
+        if city is None:
+            city = self.intern(self._resolve(city_identifier))
+            self._cities_by_identifier[city_identifier] = city
+        return city
+    
+    # register a city and return the canonical instance for its code
+    def intern(self, city: City) -> City:
+        return self._cities_by_code.setdefault(city.code, city)
+    
+    # look up a registered city by airport code
+    def get_by_code(self, code: str) -> Optional[City]:
+        return self._cities_by_code.get(code)
+    
+    # look up airport code by city name, falling back to its first 3 letters
+    def lookup_code(self, city_name: str) -> str:
+        code = self.name_to_code.get(city_name.lower())
+        if code is None:
+            return city_name[:3].upper()
+        return code
+    
+    # build a new city object from a city name or code
+    def _resolve(self, city_identifier: str) -> City:
+        # normalize the city name first
+        normalized_name = normalize_city_name(city_identifier, self.city_mappings)
+        
+        # check if input is already a city code
+        if city_identifier in self.city_codes:
+            code = city_identifier
+            name = self.city_codes[city_identifier]
+        else:
+            # treat as city name and look up code
+            name = normalized_name
+            code = self.lookup_code(name)
+        
+        return City(
+            code=code,
+            name=name,
+            normalized_name=normalized_name
+        )
+    
+    def __len__(self) -> int:
+        return len(self._cities_by_code)
+    
+    def __contains__(self, code: str) -> bool:
+        return code in self._cities_by_code
+
+
+# registry shared by every component that uses the default config mappings
+_default_registry: Optional[CityRegistry] = None
+
+
+# get the process-wide registry for the default city mappings
+def get_default_registry() -> CityRegistry:
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = CityRegistry()
+    return _default_registry
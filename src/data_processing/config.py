@@ -62,3 +62,30 @@ REALISTIC_DISCOUNTS: List[Discount] = [
     )
 ]
 
+
+# columns the pipeline reads from the raw flight csv and how to type them.
+# every column is low-cardinality, so categoricals keep one small code per row
+# (prices included: they are parsed once per distinct value during cleaning)
+FLIGHT_CSV_DTYPES: Dict[str, str] = {
+    "Airline": "category",
+    "Date_of_Journey": "category",
+    "Source": "category",
+    "Destination": "category",
+    "Route": "category",
+    "Dep_Time": "category",
+    "Arrival_Time": "category",
+    "Duration": "category",
+    "Total_Stops": "category",
+    "Additional_Info": "category",
+    "Price": "category"
+}
+
+# example traveller profiles: the memberships and card offers each traveller holds.
+# profiles price the shared base graph at query time instead of at build time
+TRAVELLER_PROFILES: Dict[str, List[Discount]] = {
+    "standard": [],                                         # no memberships
+    "indigo_member": [REALISTIC_DISCOUNTS[0]],              # indigo loyalty only
+    "jet_member": [REALISTIC_DISCOUNTS[1]],                 # jet airways loyalty only
+    "card_holder": [REALISTIC_DISCOUNTS[2]],                # credit card cashback only
+    "all_offers": REALISTIC_DISCOUNTS                       # every realistic discount
+}
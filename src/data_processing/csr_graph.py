@@ -0,0 +1,101 @@
+# compressed sparse row flight graph: flat numpy arrays instead of one dict per node and edge.
+# the out-edges of node n are edges offsets[n]:offsets[n + 1], every edge attribute is a
+# parallel array indexed by edge position
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .models import City
+
+
+@dataclass
+class CSRGraph:
+    nodes: List[str]                # city codes, node id = position
+    cities: List[City]              # city object of each node
+    offsets: np.ndarray             # int64, one more entry than there are nodes
+    targets: np.ndarray             # int32 node id each edge arrives at
+    weights: np.ndarray             # float64 graph weight used by the algorithms
+    prices: np.ndarray              # float64 discounted price
+    base_prices: np.ndarray         # float64 price before discounts
+    airline_ids: np.ndarray         # int32 index into airlines
+    duration_minutes: np.ndarray    # int64 flight duration
+    is_primary: np.ndarray          # bool, edge is the first segment of its flight
+    flight_objects: Optional[List]  # processed flight behind each edge
+    airlines: List[str]             # airline names
+    flight_ids: Optional[np.ndarray] = None  # int64 flight store id of each edge, lean graphs only
+    
+    # build from edges given in any source order. edges of the same source keep
+    # their relative order, which is the adjacency order every export follows
+    @classmethod
+    def from_edges(cls, nodes: List[str], cities: List[City], sources: np.ndarray,
+                   targets: np.ndarray, weights: np.ndarray, prices: np.ndarray,
+                   base_prices: np.ndarray, airlines: List[str], duration_minutes: np.ndarray,
+                   is_primary: np.ndarray, flight_objects: Optional[List],
+                   flight_ids: Optional[np.ndarray] = None) -> 'CSRGraph':
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(nodes)), out=offsets[1:])
+        
+        # airline names are dictionary-encoded like the flight table
+        airline_index: Dict[str, int] = {}
+        airline_ids = np.array([airline_index.setdefault(airline, len(airline_index))
+                                for airline in airlines], dtype=np.int32)
+        return cls(
+            nodes=list(nodes),
+            cities=list(cities),
+            offsets=offsets,
+            targets=np.asarray(targets, dtype=np.int32)[order],
+            weights=np.asarray(weights, dtype=np.float64)[order],
+            prices=np.asarray(prices, dtype=np.float64)[order],
+            base_prices=np.asarray(base_prices, dtype=np.float64)[order],
+            airline_ids=airline_ids[order],
+            duration_minutes=np.asarray(duration_minutes, dtype=np.int64)[order],
+            is_primary=np.asarray(is_primary, dtype=bool)[order],
+            flight_objects=None if flight_objects is None else [flight_objects[edge] for edge in order.tolist()],
+            airlines=list(airline_index),
+            flight_ids=None if flight_ids is None else np.asarray(flight_ids, dtype=np.int64)[order]
+        )
+    
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+    
+    def number_of_edges(self) -> int:
+        return len(self.targets)
+    
+    # source node id of every edge
+    def sources(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.nodes), dtype=np.int32), np.diff(self.offsets))
+    
+    # (target node ids, weights) of one node's out-edges
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return self.targets[start:end], self.weights[start:end]
+    
+    # attribute dict of one edge, same keys FlightGraph edges always carried
+    def edge_data(self, edge: int) -> Dict:
+        return {
+            'weight': float(self.weights[edge]),
+            'price': float(self.prices[edge]),
+            'base_price': float(self.base_prices[edge]),
+            'airline': self.airlines[self.airline_ids[edge]],
+            'duration_minutes': int(self.duration_minutes[edge]),
+            'stops': 0,
+            **({'flight_object': self.flight_objects[edge]} if self.flight_ids is None
+               else {'flight_id': int(self.flight_ids[edge])}),
+            'is_primary_segment': bool(self.is_primary[edge])
+        }
+    
+    # (source code, destination code, attributes) for every edge in adjacency order
+    def edges(self) -> Iterator[Tuple[str, str, Dict]]:
+        for edge, (source, target) in enumerate(zip(self.sources().tolist(), self.targets.tolist())):
+            yield self.nodes[source], self.nodes[target], self.edge_data(edge)
+    
+    # networkx copy of the graph for analysis and drawing, networkx is only needed here
+    def to_networkx(self):
+        import networkx as nx
+        graph = nx.DiGraph()
+        for code, city in zip(self.nodes, self.cities):
+            graph.add_node(code, name=city.name, normalized_name=city.normalized_name, city_object=city)
+        graph.add_edges_from(self.edges())
+        return graph
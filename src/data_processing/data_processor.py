@@ -1,27 +1,46 @@
 import re
-from typing import List, Dict, Tuple
+import time
+from typing import List, Dict, Tuple, Union
 import pandas as pd
-from .models import Flight, City, Route, StopType, Discount, ProcessedFlight
+import numpy as np
+from .models import (
+    Flight, City, Route, StopType, Discount, ProcessedFlight, FlightTable, STOP_TYPES,
+    CompactCity, CompactRoute, CompactFlight, CompactDiscount, CompactProcessedFlight
+)
 from .utils import (
     normalize_city_name, validate_price, parse_duration, parse_time,
-    parse_stops_info, clean_airline_name
+    parse_stops_info, clean_airline_name, clean_airline_column, normalize_city_column,
+    validate_price_column, parse_duration_column, parse_time_column, parse_stops_column
 )
 from .config import CITY_NAME_MAPPINGS, CITY_CODE_TO_NAME
+from .city_registry import CityRegistry, get_default_registry
+from .discounts import CompiledDiscounts
+from .stats import DiscountStats
+
+# map stop strings to enum values
+STOP_TYPE_MAP: Dict[str, StopType] = {
+    "non-stop": StopType.NON_STOP,
+    "1 stop": StopType.ONE_STOP,
+    "2 stops": StopType.TWO_STOPS
+}
 
 
 # cleans and validates raw csv flight data
 class FlightDataCleaner:
     
-    def __init__(self, city_mappings: Dict[str, str] = None):
+    def __init__(self, city_mappings: Dict[str, str] = None, verbose: bool = True):
         # use provided mappings or default ones from config
         self.city_mappings = city_mappings or CITY_NAME_MAPPINGS
+        self.verbose = verbose          # print progress messages
+        self.last_rows_per_sec = 0.0    # throughput of the last vectorized clean
         
     # clean entire dataset and return cleaned data with validation errors
     def clean_dataset(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
         errors = []
         cleaned_df = df.copy()
         
-        print(f"Processing {len(cleaned_df)} flight records...")
+        if self.verbose:
+            print(f"Processing {len(cleaned_df)} flight records...")
         
         # clean airline names to remove extra spaces and standardize
         cleaned_df['Airline'] = cleaned_df['Airline'].apply(clean_airline_name)
@@ -55,6 +74,48 @@ class FlightDataCleaner:
             lambda x: pd.Series(parse_stops_info(str(x)))
         )
         
+        cleaned_df = self._filter_valid_records(cleaned_df, errors)
+        
+        if self.verbose:
+            print(f"Successfully cleaned {len(cleaned_df)} flight records")
+        return cleaned_df, errors
+    
+    # clean entire dataset using whole-column string ops instead of per-row apply
+    def clean_dataset_vectorized(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+        errors = []
+        start_time = time.perf_counter()
+        cleaned_df = df.copy()
+        
+        if self.verbose:
+            print(f"Processing {len(cleaned_df)} flight records...")
+        
+        # same columns as clean_dataset, each computed in one pass over the column
+        cleaned_df['Airline'] = clean_airline_column(cleaned_df['Airline'])
+        cleaned_df['Source'] = normalize_city_column(cleaned_df['Source'], self.city_mappings)
+        cleaned_df['Destination'] = normalize_city_column(cleaned_df['Destination'], self.city_mappings)
+        cleaned_df['Source'], cleaned_df['Destination'] = _share_categories(
+            cleaned_df['Source'], cleaned_df['Destination']
+        )
+        cleaned_df['Cleaned_Price'] = validate_price_column(cleaned_df['Price'])
+        cleaned_df['Duration_Minutes'] = parse_duration_column(cleaned_df['Duration'])
+        cleaned_df['Departure_Time_Clean'] = parse_time_column(cleaned_df['Dep_Time'])
+        cleaned_df['Arrival_Time_Clean'] = parse_time_column(cleaned_df['Arrival_Time'])
+        cleaned_df['Stops_Normalized'], cleaned_df['Stops_Count'] = parse_stops_column(
+            cleaned_df['Total_Stops']
+        )
+        
+        cleaned_df = self._filter_valid_records(cleaned_df, errors)
+        
+        # report cleaning throughput
+        elapsed = time.perf_counter() - start_time
+        self.last_rows_per_sec = len(df) / elapsed if elapsed > 0 else float('inf')
+        if self.verbose:
+            print(f"Successfully cleaned {len(cleaned_df)} flight records "
+                  f"({self.last_rows_per_sec:,.0f} rows/sec)")
+        return cleaned_df, errors
+    
+    # flag suspicious prices and drop records that fail validation
+    def _filter_valid_records(self, cleaned_df: pd.DataFrame, errors: List[str]) -> pd.DataFrame:
         # basic validation - flag unusually expensive flights
         high_price_mask = cleaned_df['Cleaned_Price'] > 50000
         high_price_count = high_price_mask.sum()
@@ -72,23 +133,35 @@ class FlightDataCleaner:
         
         # filter out invalid records and report count
         invalid_count = len(cleaned_df) - valid_mask.sum()
-        if invalid_count > 0:
+        if invalid_count > 0 and self.verbose:
             print(f"Filtered out {invalid_count} invalid records")
         
-        cleaned_df = cleaned_df[valid_mask].reset_index(drop=True)
-        
-        print(f"Successfully cleaned {len(cleaned_df)} flight records")
-        return cleaned_df, errors
+        return cleaned_df[valid_mask].reset_index(drop=True)
 
 
 # parses flight route strings and creates route objects
 class RouteParser:
     
-    def __init__(self, city_mappings: Dict[str, str] = None):
+    def __init__(self, city_mappings: Dict[str, str] = None, verbose: bool = True,
+                 registry: CityRegistry = None):
         # use provided mappings or default ones from config
         self.city_mappings = city_mappings or CITY_NAME_MAPPINGS
         self.city_codes = CITY_CODE_TO_NAME
-        
+        self.verbose = verbose  # print progress messages
+        
+        # share city objects with everything else using the same mappings
+        if registry is None:
+            registry = CityRegistry(city_mappings) if city_mappings else get_default_registry()
+        self.registry = registry
+        self._compact_cities: Dict[str, CompactCity] = {}  # one compact city per airport code
+        
+    # frozen copy of a registry city, shared by every compact route through it
+    def compact_city(self, city: City) -> CompactCity:
+        compact = self._compact_cities.get(city.code)
+        if compact is None:
+            compact = self._compact_cities[city.code] = CompactCity.from_city(city)
+        return compact
+    
     # parse route string to extract intermediate stops
     def parse_route_string(self, route_str: str) -> List[str]:
         # handle empty or missing route strings
@@ -111,45 +184,34 @@ class RouteParser:
         # filter to only valid city codes from our mapping
         return [code for code in intermediate_codes if code in self.city_codes]
     
-    # create a city object from city name or code
+    # get the shared city object for a city name or code
     def create_city_object(self, city_identifier: str) -> City:
-        # normalize the city name first
-        normalized_name = normalize_city_name(city_identifier, self.city_mappings)
-        
-        # check if input is already a city code
-        if city_identifier in self.city_codes:
-            code = city_identifier
-            name = self.city_codes[city_identifier]
-        else:
-            # treat as city name and look up code
-            name = normalized_name
-            code = self._get_city_code(name)
-        
-        return City(
-            code=code,
-            name=name,
-            normalized_name=normalized_name
-        )
+        return self.registry.get_city(city_identifier)
     
     # look up airport code by matching city name
     def _get_city_code(self, city_name: str) -> str:
-        # look up airport code by matching city name
-        for code, name in self.city_codes.items():
-            if name.lower() == city_name.lower():
-                return code
-        # fallback: use first 3 letters of city name as code
-        return city_name[:3].upper()
+        return self.registry.lookup_code(city_name)
     
     # parse complete route information from a flight record
     def parse_flight_route(self, row: pd.Series) -> Route:
+        route_str = row['Route'] if 'Route' in row else None
+        return self.build_route(
+            str(row['Source']),
+            str(row['Destination']),
+            route_str,
+            str(row.get('Stops_Normalized', 'non-stop'))
+        )
+    
+    # build a route object from its source, destination, route string and stops
+    def build_route(self, source: str, destination: str, route_str, stops_str: str) -> Route:
         # create city objects for source and destination
-        source_city = self.create_city_object(str(row['Source']))
-        dest_city = self.create_city_object(str(row['Destination']))
+        source_city = self.create_city_object(source)
+        dest_city = self.create_city_object(destination)
         
         # parse intermediate stops if route string exists
         intermediate_codes = []
-        if 'Route' in row and pd.notna(row['Route']):
-            intermediate_codes = self.parse_route_string(str(row['Route']))
+        if route_str is not None and pd.notna(route_str):
+            intermediate_codes = self.parse_route_string(str(route_str))
         
         # convert intermediate codes to city objects
         intermediate_cities = [
@@ -157,14 +219,7 @@ class RouteParser:
         ]
         
         # map stop strings to enum values
-        stop_type_map = {
-            "non-stop": StopType.NON_STOP,
-            "1 stop": StopType.ONE_STOP,
-            "2 stops": StopType.TWO_STOPS
-        }
-        
-        stops_str = str(row.get('Stops_Normalized', 'non-stop'))
-        stop_type = stop_type_map.get(stops_str, StopType.NON_STOP)
+        stop_type = STOP_TYPE_MAP.get(stops_str, StopType.NON_STOP)
         
         return Route(
             source=source_city,
@@ -173,56 +228,299 @@ class RouteParser:
             total_stops=stop_type
         )
     
-    # convert cleaned dataframe to flight objects
-    def convert_to_flight_objects(self, cleaned_df: pd.DataFrame) -> List[Flight]:
+    # convert cleaned dataframe to flight objects (slotted, frozen ones if compact)
+    def convert_to_flight_objects(self, cleaned_df: pd.DataFrame, compact: bool = False) -> List[Flight]:
+        flights, errors = self.build_flights_batch(cleaned_df, compact)
+        
+        # report skipped rows once instead of per row
+        if errors:
+            print(f"Skipped {len(errors)} rows while creating flight objects (first: {errors[0]})")
+        
+        if self.verbose:
+            print(f"Successfully created {len(flights)} Flight objects")
+        return flights
+    
+    # convert cleaned dataframe to flight objects column by column.
+    # each distinct route is parsed once and shared by every flight that flies it,
+    # problem rows are skipped and returned as error messages
+    def build_flights_batch(self, cleaned_df: pd.DataFrame,
+                            compact: bool = False) -> Tuple[List[Flight], List[str]]:
         flights = []
+        errors = []
+        
+        for index, flight, error in self.iter_flight_rows(cleaned_df, compact):
+            if flight is None:
+                errors.append(f"row {index}: {error}")
+            else:
+                flights.append(flight)
         
-        # process each row in the cleaned dataframe
-        for _, row in cleaned_df.iterrows():
+        return flights, errors
+    
+    # yield (row index, flight, error) for every cleaned row, in order.
+    # flight is None and error holds the exception when a row cannot be converted
+    def iter_flight_rows(self, cleaned_df: pd.DataFrame, compact: bool = False):
+        flight_type = CompactFlight if compact else Flight
+        row_count = len(cleaned_df)
+        
+        # pull each column out once as a plain list
+        def column(name: str, fallback: str = None, default=None) -> list:
+            if name in cleaned_df.columns:
+                return cleaned_df[name].tolist()
+            if fallback is not None:
+                return cleaned_df[fallback].tolist()
+            return [default] * row_count
+        
+        # typed columns from cleaning, None where missing so the string is parsed instead
+        def optional_ints(name: str) -> list:
+            if name not in cleaned_df.columns:
+                return [None] * row_count
+            values = pd.to_numeric(cleaned_df[name], errors='coerce')
+            missing = values.isna().to_numpy()
+            ints = values.fillna(0).to_numpy(dtype=np.int64).tolist()
+            return [None if is_missing else value for is_missing, value in zip(missing.tolist(), ints)]
+        
+        columns = zip(
+            cleaned_df.index.tolist(),
+            column('Airline'),
+            column('Date_of_Journey'),
+            column('Source'),
+            column('Destination'),
+            column('Route'),
+            column('Stops_Normalized', default='non-stop'),
+            column('Departure_Time_Clean', fallback='Dep_Time'),
+            column('Arrival_Time_Clean', fallback='Arrival_Time'),
+            column('Duration'),
+            column('Additional_Info', default=''),
+            column('Cleaned_Price'),
+            optional_ints('Duration_Minutes'),
+            optional_ints('Stops_Count')
+        )
+        
+        # routes already built, keyed by everything that defines them
+        route_cache: Dict[tuple, Route] = {}
+        
+        for (index, airline, date_of_journey, source, destination, route_str, stops,
+             departure_time, arrival_time, duration, additional_info, price,
+             duration_minutes, stops_count) in columns:
             try:
-                # parse the route information
-                route = self.parse_flight_route(row)
+                route_key = (str(source), str(destination), route_str, str(stops))
+                route = route_cache.get(route_key)
+                if route is None:
+                    route = self.build_route(*route_key)
+                    if compact:
+                        route = CompactRoute(self.compact_city(route.source),
+                                             self.compact_city(route.destination),
+                                             tuple(self.compact_city(city) for city in route.intermediate_stops),
+                                             route.total_stops)
+                    route_cache[route_key] = route
                 
-                # create flight object with all fields
-                flight = Flight(
-                    airline=str(row['Airline']),
-                    date_of_journey=str(row['Date_of_Journey']),
+                yield index, flight_type(
+                    airline=str(airline),
+                    date_of_journey=str(date_of_journey),
                     route=route,
-                    departure_time=str(row.get('Departure_Time_Clean', row['Dep_Time'])),
-                    arrival_time=str(row.get('Arrival_Time_Clean', row['Arrival_Time'])),
-                    duration=str(row['Duration']),
-                    additional_info=str(row.get('Additional_Info', '')),
-                    base_price=float(row['Cleaned_Price'])
-                )
-                
-                flights.append(flight)
+                    departure_time=str(departure_time),
+                    arrival_time=str(arrival_time),
+                    duration=str(duration),
+                    additional_info=str(additional_info),
+                    base_price=float(price),
+                    duration_minutes=duration_minutes,
+                    stops_count=stops_count
+                ), None
                 
             except Exception as e:
                 # skip problematic records and continue processing
-                print(f"Error creating flight object: {e}")
+                yield index, None, e
+    
+    # convert cleaned dataframe straight into a columnar FlightTable.
+    # strings are dictionary-encoded and each distinct route is parsed once
+    def build_flight_table(self, cleaned_df: pd.DataFrame) -> Tuple[FlightTable, List[str]]:
+        errors = []
+        row_count = len(cleaned_df)
+        
+        # missing optional columns fall back to the same defaults as the object path
+        def column(name: str, default=None) -> pd.Series:
+            if name in cleaned_df.columns:
+                return cleaned_df[name]
+            return pd.Series([default] * row_count, index=cleaned_df.index, dtype=object)
+        
+        # a route is defined by source, destination, route string and stops,
+        # so factorize each part and combine the codes into one route key
+        route_parts = [
+            column('Source'), column('Destination'),
+            column('Route'), column('Stops_Normalized', 'non-stop')
+        ]
+        route_keys = np.zeros(row_count, dtype=np.int64)
+        part_uniques = []
+        for part in route_parts:
+            codes, uniques = pd.factorize(part, use_na_sentinel=False)
+            route_keys = route_keys * max(len(uniques), 1) + codes
+            part_uniques.append((codes, uniques))
+        row_route_ids, first_rows = _first_occurrence_codes(route_keys)
+        
+        # build the distinct routes and dictionary-encode their cities
+        city_ids: Dict[str, int] = {}
+        cities: List[City] = []
+        route_offsets = [0]
+        route_city_ids: List[int] = []
+        route_stop_types: List[int] = []
+        route_endpoints: List[Tuple[int, int]] = []
+        bad_routes = np.zeros(len(first_rows), dtype=bool)
+        
+        for route_id, first_row in enumerate(first_rows):
+            source, destination, route_str, stops = (
+                uniques[codes[first_row]] for codes, uniques in part_uniques
+            )
+            try:
+                route = self.build_route(
+                    str(source), str(destination),
+                    None if pd.isna(route_str) else route_str, str(stops)
+                )
+            except Exception as e:
+                errors.append(f"route {source} → {destination} ({route_str}): {e}")
+                bad_routes[route_id] = True
+                route_offsets.append(len(route_city_ids))
+                route_stop_types.append(0)
+                route_endpoints.append((-1, -1))
                 continue
+            
+            for city in route.all_cities:
+                if city.code not in city_ids:
+                    city_ids[city.code] = len(cities)
+                    cities.append(city)
+                route_city_ids.append(city_ids[city.code])
+            route_offsets.append(len(route_city_ids))
+            route_stop_types.append(STOP_TYPES.index(route.total_stops))
+            route_endpoints.append((city_ids[route.source.code], city_ids[route.destination.code]))
+        
+        route_endpoints = np.array(route_endpoints, dtype=np.int32).reshape(-1, 2)
+        
+        # prices must be numeric, anything else is reported and skipped
+        base_prices = pd.to_numeric(column('Cleaned_Price'), errors='coerce').to_numpy(dtype=np.float64)
+        bad_prices = np.isnan(base_prices)
+        for index in cleaned_df.index[bad_prices & ~bad_routes[row_route_ids]]:
+            errors.append(f"row {index}: invalid price")
+        valid = ~(bad_prices | bad_routes[row_route_ids])
+        
+        durations = column('Duration_Minutes')
+        if 'Duration_Minutes' not in cleaned_df.columns:
+            durations = parse_duration_column(column('Duration'))
+        
+        airline_ids, airlines = _encode_strings(column('Airline'))
+        date_ids, dates = _encode_strings(column('Date_of_Journey'))
+        duration_text_ids, duration_texts = _encode_strings(column('Duration'))
+        info_ids, infos = _encode_strings(column('Additional_Info', ''))
+        
+        table = FlightTable(
+            base_prices=base_prices[valid],
+            duration_minutes=durations.fillna(0).to_numpy(dtype=np.int32)[valid],
+            departure_times=_encode_clock_times(column('Departure_Time_Clean'))[valid],
+            arrival_times=_encode_clock_times(column('Arrival_Time_Clean'))[valid],
+            airline_ids=airline_ids[valid],
+            source_ids=route_endpoints[row_route_ids[valid], 0],
+            destination_ids=route_endpoints[row_route_ids[valid], 1],
+            route_ids=row_route_ids[valid],
+            date_ids=date_ids[valid],
+            duration_text_ids=duration_text_ids[valid],
+            info_ids=info_ids[valid],
+            route_offsets=np.array(route_offsets, dtype=np.int64),
+            route_city_ids=np.array(route_city_ids, dtype=np.int32),
+            route_stop_types=np.array(route_stop_types, dtype=np.int8),
+            airlines=airlines,
+            cities=cities,
+            dates=dates,
+            duration_texts=duration_texts,
+            infos=infos
+        )
         
-        print(f"Successfully created {len(flights)} Flight objects")
-        return flights
+        if errors:
+            print(f"Skipped {row_count - len(table)} rows while building flight table (first: {errors[0]})")
+        if self.verbose:
+            print(f"Successfully built flight table with {len(table)} flights")
+        return table, errors
+
+# give two categorical columns the same categories so they can be compared row by row,
+# other columns are returned unchanged
+def _share_categories(left: pd.Series, right: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    if not (isinstance(left.dtype, pd.CategoricalDtype) and isinstance(right.dtype, pd.CategoricalDtype)):
+        return left, right
+    categories = left.cat.categories.union(right.cat.categories)
+    return left.cat.set_categories(categories), right.cat.set_categories(categories)
+
+
+# factorize integer keys into ids numbered by first appearance,
+# returning the id of every row and the first row holding each id
+def _first_occurrence_codes(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    codes, uniques = pd.factorize(keys)
+    first_rows = np.full(len(uniques), len(keys), dtype=np.int64)
+    np.minimum.at(first_rows, codes, np.arange(len(keys)))
+    return codes.astype(np.int32), first_rows
+
+
+# dictionary-encode a column as int32 ids plus the str() of each distinct value
+def _encode_strings(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes.astype(np.int32), [str(value) for value in uniques]
+
+
+# encode HH:MM strings as HHMM integers, -1 where the time could not be parsed
+def _encode_clock_times(values: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    encoded = []
+    for value in uniques:
+        clock_time = parse_time(str(value)) if pd.notna(value) else None
+        if clock_time is None:
+            encoded.append(-1)
+        else:
+            hours, minutes = clock_time.split(":")
+            encoded.append(int(hours) * 100 + int(minutes))
+    return np.array(encoded, dtype=np.int16)[codes]
 
 
 # applies discount rules to flights and finds best deals
 class DiscountEngine:
     
-    def __init__(self, available_discounts: List[Discount]):
+    def __init__(self, available_discounts: List[Discount], verbose: bool = True,
+                 vectorized: bool = True):
         # store list of all available discounts from config
         self.available_discounts = available_discounts
+        self.verbose = verbose  # print progress messages
+        self.vectorized = vectorized  # price all flights as arrays instead of per-flight loops
+        # the same rules as slotted, frozen values with airline sets, used for pricing
+        self.rules = [CompactDiscount.from_discount(discount) for discount in available_discounts]
+        self.compiled_discounts = CompiledDiscounts(self.rules)  # rules indexed by airline
+        self.stats = DiscountStats()  # running totals over every flight this engine has priced
     
-    # apply discounts to flights and return processed flights
-    def apply_discounts(self, flights: List[Flight]) -> List[ProcessedFlight]:
+    # apply discounts to flights and return processed flights.
+    # a FlightTable is discounted in place and returned with final_prices filled in
+    def apply_discounts(self, flights: Union[List[Flight], FlightTable]) -> Union[List[ProcessedFlight], FlightTable]:
+        if isinstance(flights, FlightTable):
+            if self.vectorized:
+                return self._apply_discounts_vectorized(flights)
+            return self._apply_discounts_to_table(flights)
+        
+        # compact flights get compact processed flights
+        processed_type = ProcessedFlight
+        if flights and isinstance(flights[0], CompactFlight):
+            processed_type = CompactProcessedFlight
+        
+        if self.vectorized:
+            # dictionary-encode airlines so the list can be priced like a table
+            airline_ids, airlines = pd.factorize(pd.Series([flight.airline for flight in flights], dtype=object))
+            base_prices = np.array([flight.base_price for flight in flights], dtype=np.float64)
+            final_prices = self.compute_final_prices(airline_ids, list(airlines), base_prices)
+            self._record_prices(base_prices, final_prices)
+            return [
+                processed_type(original_flight=flight, final_price=final_price)
+                for flight, final_price in zip(flights, final_prices.tolist())
+            ]
+        
         processed_flights = []
-        discount_count = 0
         
         # process each flight and find best applicable discount
         for flight in flights:
             # check all available discounts and find the best one
             best_discount = 0.0
-            for discount in self.available_discounts:
+            for discount in self.rules:
                 discount_amount = discount.calculate_discount(flight)
                 if discount_amount > best_discount:
                     best_discount = discount_amount
@@ -230,38 +528,74 @@ class DiscountEngine:
             # apply best discount but keep minimum 50% of original price
             final_price = max(flight.base_price * 0.5, flight.base_price - best_discount)
             
-            # track how many flights got discounts
-            if best_discount > 0:
-                discount_count += 1
-            
             # create processed flight with final discounted price
-            processed_flight = ProcessedFlight(
+            processed_flight = processed_type(
                 original_flight=flight,
                 final_price=final_price
             )
             processed_flights.append(processed_flight)
         
-        print(f"Applied discounts to {discount_count} flights")
+        self._record_prices(
+            np.array([pf.original_flight.base_price for pf in processed_flights], dtype=np.float64),
+            np.array([pf.final_price for pf in processed_flights], dtype=np.float64)
+        )
         return processed_flights
     
-    # generate simple discount statistics
-    def get_discount_summary(self, processed_flights: List[ProcessedFlight]) -> Dict[str, any]:
-        total_flights = len(processed_flights)
-        
-        # count flights that got discounts (final price < original price)
-        flights_with_discounts = sum(1 for pf in processed_flights 
-                                   if pf.final_price < pf.original_flight.base_price)
-        
-        # calculate total savings across all flights
-        total_savings = sum(pf.original_flight.base_price - pf.final_price 
-                          for pf in processed_flights)
-        avg_savings = total_savings / total_flights if total_flights > 0 else 0
-        
-        # return summary statistics
-        return {
-            'total_flights': total_flights,
-            'flights_with_discounts': flights_with_discounts,
-            'discount_application_rate': flights_with_discounts / total_flights * 100,
-            'total_savings': total_savings,
-            'average_savings_per_flight': avg_savings
-        }
\ No newline at end of file
+    # best discount for every flight at once, returns final prices.
+    # same result as the per-flight loop in apply_discounts
+    def compute_final_prices(self, airline_ids: np.ndarray, airlines: List[str],
+                             base_prices: np.ndarray) -> np.ndarray:
+        best_discounts = self.compiled_discounts.best_discounts(airline_ids, airlines, base_prices)
+        
+        # apply best discount but keep minimum 50% of original price
+        return np.maximum(base_prices * 0.5, base_prices - best_discounts)
+    
+    # price a whole table with array operations
+    def _apply_discounts_vectorized(self, table: FlightTable) -> FlightTable:
+        table.final_prices = self.compute_final_prices(
+            table.airline_ids, table.airlines, table.base_prices
+        )
+        self._record_prices(table.base_prices, table.final_prices)
+        return table
+    
+    # same best-discount rule as apply_discounts, read straight from the table columns
+    def _apply_discounts_to_table(self, table: FlightTable) -> FlightTable:
+        final_prices = []
+        
+        for airline_id, base_price in zip(table.airline_ids.tolist(), table.base_prices.tolist()):
+            airline = table.airlines[airline_id]
+            
+            # check all available discounts and find the best one
+            best_discount = 0.0
+            for discount in self.rules:
+                discount_amount = discount.discount_for(airline, base_price)
+                if discount_amount > best_discount:
+                    best_discount = discount_amount
+            
+            # apply best discount but keep minimum 50% of original price
+            final_prices.append(max(base_price * 0.5, base_price - best_discount))
+        
+        table.final_prices = np.array(final_prices, dtype=np.float64)
+        self._record_prices(table.base_prices, table.final_prices)
+        return table
+    
+    # fold a freshly priced batch into the running statistics
+    def _record_prices(self, base_prices: np.ndarray, final_prices: np.ndarray) -> None:
+        batch = DiscountStats()
+        batch.add(base_prices, final_prices)
+        self.stats.merge(batch)
+        if self.verbose:
+            print(f"Applied discounts to {batch.flights_with_discounts} flights")
+    
+    # generate simple discount statistics in a single pass over the prices.
+    # flights priced by apply_discounts are already counted in self.stats
+    def get_discount_summary(self, processed_flights: Union[List[ProcessedFlight], FlightTable]) -> Dict[str, any]:
+        stats = DiscountStats()
+        if isinstance(processed_flights, FlightTable):
+            stats.add(processed_flights.base_prices, processed_flights.final_prices)
+        else:
+            stats.add(
+                np.array([pf.original_flight.base_price for pf in processed_flights], dtype=np.float64),
+                np.array([pf.final_price for pf in processed_flights], dtype=np.float64)
+            )
+        return stats.summary()
@@ -0,0 +1,115 @@
+# array versions of the discount rules in models.Discount, so a whole column of
+# fares is priced at once instead of one python call per flight and discount
+
+from typing import Dict, List, Tuple
+import numpy as np
+from .models import Discount
+
+# rows priced per block, bounds the flights x rules matrix to a few MB per rule
+ROW_BLOCK_SIZE = 65_536
+
+
+# discount rules indexed by airline. each airline gets the universal rules plus its own,
+# reduced to the ones that can still be the best discount for a non-negative price
+class CompiledDiscounts:
+    
+    def __init__(self, discounts: List[Discount]):
+        self.discounts = discounts
+        self.universal: List[Discount] = [d for d in discounts if not d.applicable_airlines]
+        self.by_airline: Dict[str, List[Discount]] = {}
+        for discount in discounts:
+            for airline in dict.fromkeys(discount.applicable_airlines):
+                self.by_airline.setdefault(airline, []).append(discount)
+        
+        self._universal_lines = _discount_lines(self.universal)
+        self._lines: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}      # airline -> rules that can win
+        self._all_lines: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # airline -> every rule
+    
+    # every rule that can apply to this airline as (rates, fixed amounts)
+    def all_lines_for(self, airline: str) -> Tuple[np.ndarray, np.ndarray]:
+        lines = self._all_lines.get(airline)
+        if lines is None:
+            specific = self.by_airline.get(airline)
+            lines = _discount_lines(self.universal + specific) if specific else self._universal_lines
+            self._all_lines[airline] = lines
+        return lines
+    
+    # the rules that can win for this airline: a rule whose percentage and fixed
+    # amount are both matched by another rule never gives the larger discount.
+    # with percentage-only and fixed-only rules this is the airline's best percentage
+    # and best fixed amount; rules mixing both keep every undominated combination
+    def lines_for(self, airline: str) -> Tuple[np.ndarray, np.ndarray]:
+        lines = self._lines.get(airline)
+        if lines is None:
+            lines = _best_lines(*self.all_lines_for(airline))
+            self._lines[airline] = lines
+        return lines
+    
+    # best discount amount per flight, 0 where nothing applies
+    def best_discounts(self, airline_ids: np.ndarray, airlines: List[str],
+                       base_prices: np.ndarray) -> np.ndarray:
+        return best_discounts_for_scenarios([self], airline_ids, airlines, base_prices)[0]
+
+
+# best discount per scenario and flight as a scenarios x flights array.
+# rows are grouped by airline once and every scenario's rules for that airline
+# are priced together, so each group is a single matrix pass
+def best_discounts_for_scenarios(scenarios: List[CompiledDiscounts], airline_ids: np.ndarray,
+                                 airlines: List[str], base_prices: np.ndarray) -> np.ndarray:
+    best = np.zeros((len(scenarios), len(base_prices)), dtype=np.float64)
+    
+    # group rows by airline so each group is priced against its own rules only
+    order = np.argsort(airline_ids, kind='stable')
+    group_starts = np.searchsorted(airline_ids[order], np.arange(len(airlines) + 1))
+    for airline_id, airline in enumerate(airlines):
+        rows = order[group_starts[airline_id]:group_starts[airline_id + 1]]
+        if len(rows) == 0:
+            continue
+        
+        prices = base_prices[rows]
+        best[:, rows] = _best_amounts(prices, [rules.lines_for(airline) for rules in scenarios])
+        
+        # pruning only holds for non-negative prices, the rest see every rule
+        negative = prices < 0
+        if negative.any():
+            best[:, rows[negative]] = _best_amounts(
+                prices[negative], [rules.all_lines_for(airline) for rules in scenarios]
+            )
+    return best
+
+
+# rates and fixed amounts of a list of discounts.
+# percentage is divided first, same operation order as Discount.discount_for
+def _discount_lines(discounts: List[Discount]) -> Tuple[np.ndarray, np.ndarray]:
+    rates = np.array([discount.percentage / 100 for discount in discounts], dtype=np.float64)
+    fixed_amounts = np.array([discount.fixed_amount for discount in discounts], dtype=np.float64)
+    return rates, fixed_amounts
+
+
+# keep the rules not dominated in both rate and fixed amount. float rounding is monotonic,
+# so for price >= 0 a dominated rule never rounds above the rule dominating it
+def _best_lines(rates: np.ndarray, fixed_amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.lexsort((-fixed_amounts, -rates))    # highest rate first, then highest fixed
+    kept = []
+    best_fixed = -np.inf
+    for index in order.tolist():
+        if fixed_amounts[index] > best_fixed:
+            kept.append(index)
+            best_fixed = fixed_amounts[index]
+    return rates[kept], fixed_amounts[kept]
+
+
+# largest capped discount for each set of rules and each price, at least 0
+def _best_amounts(prices: np.ndarray, rule_sets: List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+    # every set gets a leading zero rule, so empty sets work and the best starts at 0
+    rates = np.concatenate([np.concatenate(([0.0], set_rates)) for set_rates, _ in rule_sets])
+    fixed_amounts = np.concatenate([np.concatenate(([0.0], set_fixed)) for _, set_fixed in rule_sets])
+    set_starts = np.cumsum([0] + [len(set_rates) + 1 for set_rates, _ in rule_sets[:-1]])
+    
+    best = np.empty((len(rule_sets), len(prices)), dtype=np.float64)
+    for start in range(0, len(prices), ROW_BLOCK_SIZE):
+        block = prices[start:start + ROW_BLOCK_SIZE, np.newaxis]
+        # every discount amount for every flight, capped at 50% of the price
+        amounts = np.minimum(block * rates + fixed_amounts, block * 0.5)
+        best[:, start:start + ROW_BLOCK_SIZE] = np.maximum.reduceat(amounts, set_starts, axis=1).T
+    return np.maximum(best, 0.0)
@@ -0,0 +1,147 @@
+# every fare on every city pair, not just the cheapest one the flight graph keeps.
+# fares are sorted by weight within each pair and indexed by (pair, airline), so
+# airline-constrained queries find the cheapest allowed fare with binary searches
+# instead of rebuilding the graph
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+class FareIndex:
+
+    def __init__(self, nodes: List[str], sources: np.ndarray, targets: np.ndarray,
+                 weights: np.ndarray, prices: np.ndarray, airline_ids: np.ndarray,
+                 airlines: List[str], duration_minutes: np.ndarray, flights: List = None):
+        self.nodes = nodes                  # city codes, node id = position
+        self.airlines = airlines            # airline names
+        self._airline_index = {airline: airline_id for airline_id, airline in enumerate(airlines)}
+        self.flights = flights              # processed flight of each input fare, if kept
+        node_count = max(len(nodes), 1)
+        airline_count = max(len(airlines), 1)
+        
+        # pairs ordered like the flight graph's edges: by source node, then first appearance
+        pair_keys = sources.astype(np.int64) * node_count + targets
+        first_keys, first_fares = np.unique(pair_keys, return_index=True)
+        pair_order = np.lexsort((first_fares, first_keys // node_count))
+        pair_ranks = np.empty(len(first_keys), dtype=np.int64)
+        pair_ranks[pair_order] = np.arange(len(first_keys))
+        fare_pairs = pair_ranks[np.searchsorted(first_keys, pair_keys)]
+        
+        # fares grouped by pair, cheapest first, earlier fares first on ties
+        sequence = np.arange(len(weights))
+        order = np.lexsort((sequence, weights, fare_pairs))
+        self.fare_ids = order                                     # input position of each sorted fare
+        self.pair_offsets = np.searchsorted(fare_pairs[order], np.arange(len(first_keys) + 1))
+        self.pair_sources = (first_keys[pair_order] // node_count).astype(np.int32)
+        self.pair_targets = (first_keys[pair_order] % node_count).astype(np.int32)
+        self.weights = weights[order]
+        self.prices = prices[order]
+        self.airline_ids = airline_ids[order].astype(np.int32)
+        self.duration_minutes = duration_minutes[order]
+        self._pairs: Dict[Tuple[str, str], int] = {
+            (nodes[source], nodes[target]): pair
+            for pair, (source, target) in enumerate(zip(self.pair_sources.tolist(), self.pair_targets.tolist()))
+        }
+        
+        # per-airline index: sorted fare positions grouped by (pair, airline), cheapest first
+        airline_keys = fare_pairs[order] * airline_count + self.airline_ids
+        self._airline_order = np.lexsort((np.arange(len(order)), airline_keys))
+        sorted_keys = airline_keys[self._airline_order]
+        group_starts = np.flatnonzero(np.diff(sorted_keys, prepend=-1))
+        self._airline_keys = sorted_keys[group_starts]
+        self._airline_starts = np.append(group_starts, len(sorted_keys))
+        self._airline_count = airline_count
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    @property
+    def pair_count(self) -> int:
+        return len(self.pair_sources)
+    
+    # every fare between two cities, cheapest first
+    def fares(self, source: str, destination: str) -> List[Dict]:
+        pair = self._pairs.get((source, destination))
+        if pair is None:
+            return []
+        return [self.fare_data(fare) for fare in range(self.pair_offsets[pair], self.pair_offsets[pair + 1])]
+    
+    # fares between two cities with weight at most max_weight, cheapest first
+    def fares_within(self, source: str, destination: str, max_weight: float) -> List[Dict]:
+        pair = self._pairs.get((source, destination))
+        if pair is None:
+            return []
+        start, end = self.pair_offsets[pair], self.pair_offsets[pair + 1]
+        end = start + np.searchsorted(self.weights[start:end], max_weight, side='right')
+        return [self.fare_data(fare) for fare in range(start, end)]
+    
+    # airlines flying between two cities, each with its cheapest fare position
+    def airline_fares(self, source: str, destination: str) -> Dict[str, int]:
+        pair = self._pairs.get((source, destination))
+        if pair is None:
+            return {}
+        first, last = np.searchsorted(self._airline_keys, [pair * self._airline_count,
+                                                           (pair + 1) * self._airline_count])
+        return {
+            self.airlines[key % self._airline_count]: int(self._airline_order[self._airline_starts[group]])
+            for group, key in zip(range(first, last), self._airline_keys[first:last].tolist())
+        }
+    
+    # cheapest fare between two cities, optionally only on one airline: one binary search
+    def cheapest_fare(self, source: str, destination: str, airline: str = None) -> Optional[Dict]:
+        pair = self._pairs.get((source, destination))
+        if pair is None:
+            return None
+        if airline is None:
+            return self.fare_data(self.pair_offsets[pair])
+        if airline not in self._airline_index:
+            return None
+        
+        key = pair * self._airline_count + self._airline_index[airline]
+        group = np.searchsorted(self._airline_keys, key)
+        if group == len(self._airline_keys) or self._airline_keys[group] != key:
+            return None
+        return self.fare_data(self._airline_order[self._airline_starts[group]])
+    
+    # cheapest fare per pair under airline constraints, as an edge list for dynamic programming.
+    # avoided airlines are skipped, fares outside the preferred airlines have their weight
+    # multiplied by non_preferred_penalty when comparing, same as the DP cost rule
+    def edge_list_data(self, preferred_airlines: Iterable[str] = (), avoid_airlines: Iterable[str] = (),
+                       non_preferred_penalty: float = 1.0) -> List[Dict]:
+        preferred_airlines = set(preferred_airlines)
+        avoid_airlines = set(avoid_airlines)
+        edges = []
+        for source, destination in self._pairs:
+            best_fare, best_cost = None, float('inf')
+            for airline, fare in self.airline_fares(source, destination).items():
+                if airline in avoid_airlines:
+                    continue
+                cost = self.weights[fare]
+                if preferred_airlines and airline not in preferred_airlines:
+                    cost *= non_preferred_penalty
+                # earlier position wins ties, the same fare the unconstrained graph keeps
+                if cost < best_cost or (cost == best_cost and fare < best_fare):
+                    best_fare, best_cost = fare, cost
+            if best_fare is not None:
+                edges.append(self.fare_data(best_fare))
+        return edges
+    
+    # one fare in the edge list format, plus its fare id
+    def fare_data(self, fare: int) -> Dict:
+        pair = np.searchsorted(self.pair_offsets, fare, side='right') - 1
+        return {
+            'source': self.nodes[self.pair_sources[pair]],
+            'destination': self.nodes[self.pair_targets[pair]],
+            'weight': float(self.weights[fare]),
+            'price': float(self.prices[fare]),
+            'airline': self.airlines[self.airline_ids[fare]],
+            'duration_minutes': int(self.duration_minutes[fare]),
+            'stops': 0,
+            'fare_id': int(self.fare_ids[fare])
+        }
+    
+    # processed flight behind a fare id, when the graph kept flight data
+    def flight(self, fare_id: int):
+        if self.flights is None:
+            raise ValueError("Flight data was not kept for this fare index")
+        return self.flights[fare_id]
@@ -0,0 +1,282 @@
+# binary flight graph artifact: the compiled CSR arrays written as-is, so readers
+# memory-map the file and use typed views over it instead of parsing json.
+# it is the one file every algorithm reads, each through its own zero-copy view:
+# AdjacencyView for dijkstra, EdgeArrayView for bellman-ford and
+# AttributedAdjacencyView for dynamic programming
+#
+# layout, all little-endian:
+#   header       magic, format version, section count, node, edge and airline counts
+#   directory    (byte offset, byte length) of every section in SECTIONS order
+#   sections     raw array bytes, each starting on an ALIGNMENT byte boundary
+# city codes and airline names are string tables: utf-8 bytes plus int64 offsets
+
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from .csr_graph import CSRGraph
+
+MAGIC = b'FLTGRAPH'
+# bump when the layout or the section list changes, readers reject other versions
+ARTIFACT_FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<8sIIQQQ')    # magic, version, section count, nodes, edges, airlines
+_SECTION = struct.Struct('<QQ')         # byte offset, byte length
+ALIGNMENT = 64
+
+# edges converted to python values at a time while iterating an EdgeArrayView
+EDGE_WINDOW = 65_536
+
+# bytes hashed at a time, so hashing never copies a whole artifact onto the heap
+HASH_BLOCK_SIZE = 1 << 20
+
+# section name -> element type, in file order
+SECTIONS: List[Tuple[str, str]] = [
+    ('node_name_offsets', '<i8'),   # node i's code is node_names[offsets[i]:offsets[i + 1]]
+    ('node_names', 'u1'),
+    ('airline_name_offsets', '<i8'),
+    ('airline_names', 'u1'),
+    ('offsets', '<i8'),             # CSR row offsets, one more entry than there are nodes
+    ('sources', '<i4'),             # source node of every edge, so edge arrays need no expansion
+    ('targets', '<i4'),
+    ('weights', '<f8'),
+    ('prices', '<f8'),
+    ('duration_minutes', '<i4'),
+    ('airline_ids', '<i4'),
+]
+
+
+# encode strings as one utf-8 byte buffer plus the offset of every string in it
+def _string_table(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _decode_strings(offsets: np.ndarray, data: np.ndarray) -> List[str]:
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
+
+
+# serialize a compiled graph into artifact bytes
+def graph_artifact_bytes(graph: CSRGraph) -> bytes:
+    node_name_offsets, node_names = _string_table(graph.nodes)
+    airline_name_offsets, airline_names = _string_table(graph.airlines)
+    arrays = {
+        'node_name_offsets': node_name_offsets,
+        'node_names': node_names,
+        'airline_name_offsets': airline_name_offsets,
+        'airline_names': airline_names,
+        'offsets': graph.offsets,
+        'sources': graph.sources(),
+        'targets': graph.targets,
+        'weights': graph.weights,
+        'prices': graph.prices,
+        'duration_minutes': graph.duration_minutes,
+        'airline_ids': graph.airline_ids,
+    }
+    
+    # lay the sections out after the header and directory, each one aligned
+    position = _HEADER.size + _SECTION.size * len(SECTIONS)
+    directory, payload = [], []
+    for name, dtype in SECTIONS:
+        data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+        padding = -position % ALIGNMENT
+        payload.append(b'\0' * padding)
+        position += padding
+        directory.append(_SECTION.pack(position, len(data)))
+        payload.append(data)
+        position += len(data)
+    
+    header = _HEADER.pack(MAGIC, ARTIFACT_FORMAT_VERSION, len(SECTIONS),
+                          graph.number_of_nodes(), graph.number_of_edges(), len(graph.airlines))
+    return b''.join([header, *directory, *payload])
+
+
+# write a compiled graph to an artifact file
+def write_graph_artifact(output_file: str, graph: CSRGraph) -> None:
+    write_file_atomic(output_file, graph_artifact_bytes(graph))
+
+
+# write to a temp file first and rename it over the target, so readers that
+# memory-map the artifact (a running route server) never see a partial file and
+# keep their old mapping valid. same pattern as the flight table cache
+def write_file_atomic(output_file: str, data: bytes) -> None:
+    temp_path = f"{output_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, output_file)
+
+
+# true if the file starts with the artifact magic
+def is_graph_artifact(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# read-only view of an artifact. every array is a numpy view straight over the
+# buffer (usually a memory map), nothing is copied or parsed except the names
+class GraphArtifact:
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Graph artifact is truncated")
+        magic, version, section_count, node_count, edge_count, airline_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a flight graph artifact")
+        if version != ARTIFACT_FORMAT_VERSION or section_count != len(SECTIONS):
+            raise ValueError(f"Unsupported graph artifact version {version}, "
+                             f"expected {ARTIFACT_FORMAT_VERSION}")
+        
+        arrays: Dict[str, np.ndarray] = {}
+        for index, (name, dtype) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(buffer, _HEADER.size + _SECTION.size * index)
+            dtype = np.dtype(dtype)
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        
+        self.offsets = arrays['offsets']                    # int64 CSR row offsets
+        self.sources = arrays['sources']                    # int32 node id each edge leaves from
+        self.targets = arrays['targets']                    # int32 node id each edge arrives at
+        self.weights = arrays['weights']                    # float64 graph weight
+        self.prices = arrays['prices']                      # float64 discounted price
+        self.duration_minutes = arrays['duration_minutes']  # int32 flight duration
+        self.airline_ids = arrays['airline_ids']            # int32 index into airlines
+        self.nodes = _decode_strings(arrays['node_name_offsets'], arrays['node_names'])
+        self.airlines = _decode_strings(arrays['airline_name_offsets'], arrays['airline_names'])
+        self.node_ids = {code: node for node, code in enumerate(self.nodes)}
+        if (len(self.nodes), len(self.targets), len(self.airlines)) != (node_count, edge_count, airline_count):
+            raise ValueError("Graph artifact is truncated")
+    
+    # memory-map an artifact file
+    @classmethod
+    def open(cls, path: str) -> 'GraphArtifact':
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    # sha256 of the artifact bytes, read from the buffer in blocks
+    def sha256(self) -> str:
+        digest = hashlib.sha256()
+        buffer = memoryview(self._buffer)
+        for start in range(0, len(buffer), HASH_BLOCK_SIZE):
+            digest.update(buffer[start:start + HASH_BLOCK_SIZE])
+        return digest.hexdigest()
+    
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+    
+    def number_of_edges(self) -> int:
+        return len(self.targets)
+    
+    # {destination: weight} of one city's departures, the dijkstra json row
+    def neighbors(self, code: str) -> Dict[str, float]:
+        node = self.node_ids[code]
+        start, end = self.offsets[node], self.offsets[node + 1]
+        nodes = self.nodes
+        return {nodes[target]: weight for target, weight in
+                zip(self.targets[start:end].tolist(), self.weights[start:end].tolist())}
+    
+    # view for dijkstra
+    def adjacency(self) -> 'AdjacencyView':
+        return AdjacencyView(self)
+    
+    # view for bellman-ford
+    def edge_arrays(self) -> 'EdgeArrayView':
+        return EdgeArrayView(self)
+    
+    # view for dynamic programming
+    def attributed_adjacency(self) -> 'AttributedAdjacencyView':
+        return AttributedAdjacencyView(self)
+    
+    # one edge in the edge list json format
+    def edge_data(self, edge: int, source: int) -> Dict:
+        return {
+            'source': self.nodes[source],
+            'destination': self.nodes[self.targets[edge]],
+            'weight': float(self.weights[edge]),
+            'price': float(self.prices[edge]),
+            'airline': self.airlines[self.airline_ids[edge]],
+            'duration_minutes': int(self.duration_minutes[edge]),
+            'stops': 0
+        }
+    
+    # every edge in the edge list json format, in adjacency order
+    def edge_list(self) -> List[Dict]:
+        return [self.edge_data(edge, source) for edge, source in enumerate(self.sources.tolist())]
+
+
+# read-only {source: {destination: weight}} mapping shaped like the dijkstra json.
+# rows are built from the arrays when looked up, nothing is built up front
+class AdjacencyView(Mapping):
+
+    def __init__(self, artifact: GraphArtifact):
+        self._artifact = artifact
+    
+    def __getitem__(self, code: str) -> Dict[str, float]:
+        return self._artifact.neighbors(code)
+    
+    def __contains__(self, code) -> bool:
+        return code in self._artifact.node_ids
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._artifact.nodes)
+    
+    def __len__(self) -> int:
+        return len(self._artifact.nodes)
+
+
+# every edge as a (source, destination, weight) row, the bellman-ford json edges.
+# sources, targets and weights are the artifact's own arrays, converted one
+# EDGE_WINDOW slice at a time so a relaxation pass holds only that many rows
+class EdgeArrayView:
+
+    def __init__(self, artifact: GraphArtifact):
+        self.nodes = artifact.nodes
+        self.sources = artifact.sources
+        self.targets = artifact.targets
+        self.weights = artifact.weights
+    
+    def __iter__(self) -> Iterator[Tuple[str, str, float]]:
+        nodes = self.nodes
+        for start in range(0, len(self.targets), EDGE_WINDOW):
+            window = slice(start, start + EDGE_WINDOW)
+            for source, target, weight in zip(self.sources[window].tolist(), self.targets[window].tolist(),
+                                              self.weights[window].tolist()):
+                yield nodes[source], nodes[target], weight
+    
+    def __len__(self) -> int:
+        return len(self.targets)
+
+
+# {source: [edge dict, ...]} mapping with the edge list json attributes, the graph
+# dynamic programming builds from the edge list. each city's row is built on
+# first lookup and kept, since the DP visits the same city once per stop count
+class AttributedAdjacencyView(Mapping):
+
+    def __init__(self, artifact: GraphArtifact):
+        self._artifact = artifact
+        self._rows: Dict[str, List[Dict]] = {}
+    
+    def __getitem__(self, code: str) -> List[Dict]:
+        row = self._rows.get(code)
+        if row is None:
+            artifact = self._artifact
+            node = artifact.node_ids[code]
+            row = [artifact.edge_data(edge, node)
+                   for edge in range(artifact.offsets[node], artifact.offsets[node + 1])]
+            self._rows[code] = row
+        return row
+    
+    def __contains__(self, code) -> bool:
+        return code in self._artifact.node_ids
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._artifact.nodes)
+    
+    def __len__(self) -> int:
+        return len(self._artifact.nodes)
@@ -1,85 +1,335 @@
-import networkx as nx
 import json
-from typing import List, Dict
-from .models import ProcessedFlight, City
-from .utils import calculate_weighted_price
+from array import array
+from itertools import islice
+from dataclasses import dataclass
+from typing import List, Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+import numpy as np
+import pandas as pd
+from .csr_graph import CSRGraph
+from .fare_index import FareIndex
+from .graph_artifact import graph_artifact_bytes, write_graph_artifact
+from .models import ProcessedFlight, City, FlightTable
+from .utils import calculate_weighted_price, flight_duration_minutes
+from .city_registry import CityRegistry, get_default_registry
 
 
-# builds networkx graph from processed flight data
+# builds the directed flight graph from processed flight data.
+# edges are kept as flat attribute columns while the graph is built and
+# compiled into a CSRGraph for export, networkx is only an optional view
 class FlightGraph:
     
-    def __init__(self):
-        # directed graph since flights have specific directions
-        self.graph = nx.DiGraph()
-        self.city_nodes: Dict[str, City] = {}       # city code -> city object mapping
+    def __init__(self, verbose: bool = True, registry: CityRegistry = None,
+                 keep_all_fares: bool = False, lean: bool = False):
+        self.city_nodes: Dict[str, City] = {}       # city code -> city object mapping, in node order
         self.flight_edges: List[ProcessedFlight] = []  # store all flight data
+        self.flight_tables: List[FlightTable] = []     # columnar flight data, same role
+        self.verbose = verbose                       # print progress messages
+        self.registry = registry or get_default_registry()  # canonical city objects
+        self.keep_all_fares = keep_all_fares            # also index every fare per city pair, see fares
         
-    # add processed flights to the graph
-    def add_flights(self, processed_flights: List[ProcessedFlight]) -> None:
-        print(f"Building graph from {len(processed_flights)} flights...")
+        # lean mode: edges hold a flight id into flight_store instead of a flight object,
+        # and flight lists or tables are never kept, so memory follows the edge count
+        self.lean = lean
+        self.flight_store: Optional[FlightStore] = FlightStore() if lean else None
         
-        # add each flight as nodes and edges in the graph
-        for processed_flight in processed_flights:
-            self._add_flight_to_graph(processed_flight)
+        # edge storage: an edge is a slot in the attribute columns, adjacency keeps the
+        # slot of each (source, destination) in insertion order per source
+        self._adjacency: Dict[str, Dict[str, int]] = {}   # source code -> {destination code: slot}
+        self._in_degree: Dict[str, int] = {}               # destination code -> incoming edges
+        self._weights = array('d')
+        self._prices = array('d')
+        self._base_prices = array('d')
+        self._durations = array('q')
+        self._primary = array('b')
+        self._airlines: List[str] = []
+        self._flight_objects: List[ProcessedFlight] = []
+        self._flight_ids = array('q')                      # lean mode, id in flight_store
+        self._free_slots: List[int] = []                   # slots of removed edges, reused first
+        self._edge_count = 0
+        self._csr: Optional[CSRGraph] = None              # compiled graph, dropped on every change
         
-        # store flights for later export operations
-        self.flight_edges = processed_flights
+        # multigraph mode: every segment of every batch, indexed on first use
+        self._fare_batches: List[Tuple] = []
+        self._fare_index: Optional[FareIndex] = None
         
-        print(f"Graph built with {self.graph.number_of_nodes()} cities and {self.graph.number_of_edges()} direct routes")
-    
-    # add a single flight to the graph
-    def _add_flight_to_graph(self, processed_flight: ProcessedFlight) -> None:
-        flight = processed_flight.original_flight
-        route = flight.route
+    # add processed flights to the graph, optionally keeping the flight list.
+    # repeated calls keep inserting in order, so a file can be added in batches
+    def add_flights(self, processed_flights: Union[List[ProcessedFlight], FlightTable],
+                    keep_flight_data: bool = True) -> None:
+        if self.verbose:
+            print(f"Building graph from {len(processed_flights)} flights...")
+        keep_flight_data = keep_flight_data and not self.lean
         
-        # add all cities as nodes first
-        self._add_city_node(route.source)
-        self._add_city_node(route.destination)
+        if isinstance(processed_flights, FlightTable):
+            # columnar input, flight objects are only built for edges that keep them
+            self._add_table_to_graph(processed_flights, keep_flight_data)
+            if keep_flight_data:
+                self.flight_tables.append(processed_flights)
+        else:
+            # add all flights as nodes and cheapest edges in one pass
+            self._add_flights_bulk(processed_flights, keep_flight_data)
+            
+            # store flights for later export operations
+            if keep_flight_data:
+                self.flight_edges.extend(processed_flights)
         
-        # add intermediate stops as nodes too
-        for intermediate_city in route.intermediate_stops:
-            self._add_city_node(intermediate_city)
+        if self.lean:
+            self._compact_flight_store()
+        if self.verbose:
+            self.print_summary()
+    
+    # report graph size
+    def print_summary(self) -> None:
+        print(f"Graph built with {self.number_of_nodes()} cities and {self.number_of_edges()} direct routes")
+    
+    def number_of_nodes(self) -> int:
+        return len(self.city_nodes)
+    
+    def number_of_edges(self) -> int:
+        return self._edge_count
+    
+    # city codes in node order
+    def nodes(self) -> List[str]:
+        return list(self.city_nodes)
+    
+    def has_edge(self, source_code: str, destination_code: str) -> bool:
+        return destination_code in self._adjacency.get(source_code, {})
+    
+    # attributes of one edge, None if the cities are not connected
+    def get_edge_data(self, source_code: str, destination_code: str) -> Optional[Dict]:
+        slot = self._adjacency.get(source_code, {}).get(destination_code)
+        if slot is None:
+            return None
+        return {
+            'weight': self._weights[slot],
+            'price': self._prices[slot],
+            'base_price': self._base_prices[slot],
+            'airline': self._airlines[slot],
+            'duration_minutes': self._durations[slot],
+            'stops': 0,
+            **self._flight_ref(slot),
+            'is_primary_segment': bool(self._primary[slot])
+        }
+    
+    # full flight behind an edge, built from the flight store for lean graphs
+    def edge_flight(self, source_code: str, destination_code: str) -> Optional[ProcessedFlight]:
+        slot = self._adjacency.get(source_code, {}).get(destination_code)
+        if slot is None:
+            return None
+        if self.lean:
+            return self.flight_store.processed_flight(self._flight_ids[slot])
+        return self._flight_objects[slot]
+    
+    # the flight part of an edge's attributes: a flight id for lean graphs, else the object
+    def _flight_ref(self, slot: int) -> Dict:
+        if self.lean:
+            return {'flight_id': self._flight_ids[slot]}
+        return {'flight_object': self._flight_objects[slot]}
+    
+    # (source code, destination code, attributes) for every edge in adjacency order
+    def edges(self) -> Iterator[Tuple[str, str, Dict]]:
+        for source, targets in self._adjacency.items():
+            for dest in targets:
+                yield source, dest, self.get_edge_data(source, dest)
+    
+    # incoming plus outgoing edges of a city
+    def degree(self, code: str) -> int:
+        return len(self._adjacency.get(code, {})) + self._in_degree.get(code, 0)
+    
+    # compiled array form of the graph, rebuilt only after the graph changes
+    @property
+    def csr(self) -> CSRGraph:
+        if self._csr is None:
+            self._csr = self._compile()
+        return self._csr
+    
+    # networkx copy of the graph, needs networkx installed
+    def to_networkx(self):
+        return self.csr.to_networkx()
+    
+    # every fare on every city pair, sorted by weight and indexed by airline.
+    # only available for graphs built with keep_all_fares
+    @property
+    def fares(self) -> FareIndex:
+        if not self.keep_all_fares:
+            raise ValueError("Graph was built without keep_all_fares, only the cheapest fares are kept")
+        if self._fare_index is None:
+            self._fare_index = self._build_fare_index()
+        return self._fare_index
+    
+    # remember one batch of segments for the fare index
+    def _record_fares(self, source_codes: np.ndarray, destination_codes: np.ndarray, weights: np.ndarray,
+                      prices: np.ndarray, airlines: np.ndarray, durations: np.ndarray,
+                      rows: np.ndarray, flight_source) -> None:
+        self._fare_batches.append(
+            (source_codes, destination_codes, weights, prices, airlines, durations, rows, flight_source)
+        )
+        self._fare_index = None
+    
+    # index the fares of every batch added so far, in insertion order
+    def _build_fare_index(self) -> FareIndex:
+        columns = list(zip(*self._fare_batches)) or [[np.empty(0)]] * 8
+        node_ids = pd.Index(list(self.city_nodes))
+        airline_ids, airlines = pd.factorize(np.concatenate(columns[4]))
+        flight_sources = columns[7]
+        return FareIndex(
+            nodes=list(self.city_nodes),
+            sources=node_ids.get_indexer(np.concatenate(columns[0])),
+            targets=node_ids.get_indexer(np.concatenate(columns[1])),
+            weights=np.concatenate(columns[2]).astype(np.float64),
+            prices=np.concatenate(columns[3]).astype(np.float64),
+            airline_ids=airline_ids,
+            airlines=list(airlines),
+            duration_minutes=np.concatenate(columns[5]).astype(np.int64),
+            flights=(_FareFlights(columns[6], flight_sources)
+                     if all(source is not None for source in flight_sources) else None)
+        )
+    
+    # add a list of processed flights in bulk: every route is split into segments,
+    # weighted as arrays and reduced to the cheapest segment per city pair at once
+    def _add_flights_bulk(self, processed_flights: List[ProcessedFlight], keep_flight_data: bool = True) -> None:
+        city_ids: Dict[str, int] = {}
+        cities: List[City] = []
+        rows, source_ids, destination_ids, is_primary = [], [], [], []
+        final_prices, durations = [], []
         
-        # create edges between consecutive cities in the route
-        all_cities = route.all_cities
-        for i in range(len(all_cities) - 1):
-            source_city = all_cities[i]
-            dest_city = all_cities[i + 1]
+        for row, processed_flight in enumerate(processed_flights):
+            flight = processed_flight.original_flight
+            route = flight.route
+            
+            # add all cities as nodes first, intermediate stops after the endpoints
+            for city in [route.source, route.destination] + list(route.intermediate_stops):
+                self._add_city_node(city)
+            
+            route_ids = []
+            for city in route.all_cities:
+                if city.code not in city_ids:
+                    city_ids[city.code] = len(cities)
+                    cities.append(city)
+                route_ids.append(city_ids[city.code])
             
-            # add edge with flight data (first segment gets full flight info)
-            self._add_flight_edge(source_city, dest_city, processed_flight, i == 0)
+            # one segment between each pair of consecutive cities
+            segment_count = len(route_ids) - 1
+            rows.extend([row] * segment_count)
+            source_ids.extend(route_ids[:-1])
+            destination_ids.extend(route_ids[1:])
+            is_primary.extend([True] + [False] * (segment_count - 1) if segment_count else [])
+            
+            # minutes parsed during cleaning, the duration string is not parsed again
+            final_prices.append(processed_flight.final_price)
+            durations.append(flight_duration_minutes(flight))
+        
+        segments = group_segments(
+            np.array(rows, dtype=np.int64), np.array(source_ids, dtype=np.int32),
+            np.array(destination_ids, dtype=np.int32), np.array(is_primary, dtype=bool), len(cities)
+        )
+        # weighted price considering duration (price + time penalty), every segment of a flight shares it
+        weights = calculate_weighted_price(
+            np.array(final_prices, dtype=np.float64), np.array(durations, dtype=np.int64)
+        )[segments.rows]
+        
+        if self.keep_all_fares:
+            codes = np.array([city.code for city in cities], dtype=object)
+            self._record_fares(
+                codes[segments.source_ids], codes[segments.destination_ids], weights,
+                np.array(final_prices, dtype=np.float64)[segments.rows],
+                np.array([flight.original_flight.airline for flight in processed_flights], dtype=object)[segments.rows],
+                np.array(durations, dtype=np.int64)[segments.rows], segments.rows,
+                processed_flights if keep_flight_data else None
+            )
+        
+        codes = [city.code for city in cities]
+        winners = self._winning_segments(codes, segments, cheapest_segments(segments, weights), weights)
+        rows = segments.rows[[segment for segment, _, _ in winners]]
+        flight_ids = self.flight_store.add(processed_flights, rows).tolist() if self.lean else [None] * len(rows)
+        for (segment, source_code, dest_code), row, flight_id in zip(winners, rows.tolist(), flight_ids):
+            self.set_edge(source_code, dest_code, self._edge_data(
+                processed_flights[row], float(weights[segment]), durations[row],
+                bool(segments.is_primary[segment]), flight_id
+            ))
+    
+    # add every row of a discounted flight table: split routes into segments,
+    # weight them as arrays and keep the cheapest segment per city pair
+    def _add_table_to_graph(self, table: FlightTable, keep_flight_data: bool = True) -> None:
+        segments = explode_segments(table)
+        weights = segment_weights(table, segments)
+        if self.keep_all_fares:
+            codes = np.array([city.code for city in table.cities], dtype=object)
+            self._record_fares(
+                codes[segments.source_ids], codes[segments.destination_ids], weights,
+                table.final_prices[segments.rows],
+                np.array(table.airlines, dtype=object)[table.airline_ids[segments.rows]],
+                table.duration_minutes[segments.rows], segments.rows,
+                table if keep_flight_data else None
+            )
+        self.add_cheapest_segments(table, segments, cheapest_segments(segments, weights), weights)
+    
+    # add a table whose cheapest segment per city pair was already picked, e.g. by
+    # cheapest_segments. pairs already in the graph only change for a strictly cheaper
+    # segment, so adding a file in batches gives the same graph as adding it at once
+    def add_cheapest_segments(self, table: FlightTable, segments: 'SegmentTable',
+                              chosen_segments: np.ndarray, weights: np.ndarray) -> None:
+        for city_id in city_insertion_order(table):
+            self._add_city_node(table.cities[city_id])
+        
+        # pairs are numbered by first appearance, the order flights reach the graph in.
+        # only segments that become an edge get their flight stored or built
+        codes = [city.code for city in table.cities]
+        winners = self._winning_segments(codes, segments, chosen_segments, weights)
+        rows = segments.rows[[segment for segment, _, _ in winners]]
+        flight_ids = self.flight_store.add(table, rows).tolist() if self.lean else [None] * len(rows)
+        for (segment, source_code, dest_code), row, flight_id in zip(winners, rows.tolist(), flight_ids):
+            self.set_edge(source_code, dest_code, {
+                'weight': float(weights[segment]),
+                'price': float(table.final_prices[row]),
+                'base_price': float(table.base_prices[row]),
+                'airline': table.airlines[table.airline_ids[row]],
+                'duration_minutes': int(table.duration_minutes[row]),
+                'stops': 0,
+                **({'flight_id': flight_id} if self.lean else {'flight_object': table.processed_flight(row)}),
+                'is_primary_segment': bool(segments.is_primary[segment])
+            })
+    
+    # the chosen segments that would add an edge or beat the current one, as
+    # (segment, source code, destination code). each pair appears once in chosen_segments
+    def _winning_segments(self, codes: List[str], segments: 'SegmentTable', chosen_segments: np.ndarray,
+                          weights: np.ndarray) -> List[Tuple[int, str, str]]:
+        winners = []
+        for segment, source_id, dest_id, weight in zip(
+                chosen_segments.tolist(), segments.source_ids[chosen_segments].tolist(),
+                segments.destination_ids[chosen_segments].tolist(), weights[chosen_segments].tolist()):
+            source_code, dest_code = codes[source_id], codes[dest_id]
+            if self._beats_edge(source_code, dest_code, weight):
+                winners.append((segment, source_code, dest_code))
+        return winners
     
     # add a city as a node in the graph
     def _add_city_node(self, city: City) -> None:
         # only add if not already present
         if city.code not in self.city_nodes:
+            # store the shared registry instance rather than this copy
+            city = self.registry.intern(city)
             self.city_nodes[city.code] = city
-            self.graph.add_node(
-                city.code,
-                name=city.name,
-                normalized_name=city.normalized_name,
-                city_object=city
-            )
+            self._adjacency[city.code] = {}
+            self._csr = None
     
-    # add a flight edge between two cities
-    def _add_flight_edge(self, source: City, destination: City, 
-                        processed_flight: ProcessedFlight, is_primary_segment: bool) -> None:
+    # package all edge attributes for algorithms
+    def _edge_data(self, processed_flight: ProcessedFlight, weight: float,
+                   duration_minutes: int, is_primary_segment: bool, flight_id: int = None) -> Dict:
         flight = processed_flight.original_flight
-        
-        # parse duration string to minutes
-        duration_minutes = 0
-        if hasattr(flight, 'duration') and flight.duration:
-            from .utils import parse_duration
-            duration_minutes = parse_duration(flight.duration) or 0
-        
-        # calculate weighted price considering duration (price + time penalty)
-        weight = calculate_weighted_price(
-            processed_flight.final_price,
-            duration_minutes
-        )
-        
-        # package all edge attributes for algorithms
-        edge_data = {
+        if flight_id is not None:
+            # lean graphs point at the flight store instead of holding the flight
+            return {
+                'weight': weight,
+                'price': processed_flight.final_price,
+                'base_price': flight.base_price,
+                'airline': flight.airline,
+                'duration_minutes': duration_minutes,
+                'stops': 0,
+                'flight_id': flight_id,
+                'is_primary_segment': is_primary_segment
+            }
+        return {
             'weight': weight,                           # final weight for algorithms
             'price': processed_flight.final_price,     # discounted price
             'base_price': flight.base_price,           # original price
@@ -89,74 +339,448 @@ class FlightGraph:
             'flight_object': processed_flight,         # full flight data
             'is_primary_segment': is_primary_segment   # true for main route segment
         }
+    
+    # true if an edge of this weight would be added: first flight between these
+    # cities, or cheaper than the current one
+    def _beats_edge(self, source_code: str, destination_code: str, weight: float) -> bool:
+        slot = self._adjacency[source_code].get(destination_code)
+        return slot is None or weight < self._weights[slot]
+    
+    # add an edge, or overwrite the attributes of an existing one in place.
+    # an overwritten edge keeps its position in the adjacency order
+    def set_edge(self, source_code: str, destination_code: str, edge_data: Dict) -> None:
+        targets = self._adjacency[source_code]
+        slot = targets.get(destination_code)
+        if slot is None:
+            slot = self._new_slot()
+            targets[destination_code] = slot
+            self._in_degree[destination_code] = self._in_degree.get(destination_code, 0) + 1
+            self._edge_count += 1
+        
+        self._weights[slot] = edge_data['weight']
+        self._prices[slot] = edge_data['price']
+        self._base_prices[slot] = edge_data['base_price']
+        self._durations[slot] = edge_data['duration_minutes']
+        self._primary[slot] = edge_data['is_primary_segment']
+        self._airlines[slot] = edge_data['airline']
+        if self.lean:
+            self._flight_ids[slot] = edge_data['flight_id']
+        else:
+            self._flight_objects[slot] = edge_data['flight_object']
+        self._csr = None
+    
+    # drop one edge, its slot is reused by the next new edge
+    def remove_edge(self, source_code: str, destination_code: str) -> None:
+        slot = self._adjacency[source_code].pop(destination_code)
+        self._in_degree[destination_code] -= 1
+        self._flight_objects[slot] = None
+        self._free_slots.append(slot)
+        self._edge_count -= 1
+        self._csr = None
+    
+    # drop a city that has no edges left
+    def remove_city(self, code: str) -> None:
+        if self.degree(code) != 0:
+            raise ValueError(f"City '{code}' still has flights")
+        del self.city_nodes[code]
+        del self._adjacency[code]
+        self._in_degree.pop(code, None)
+        self._csr = None
+    
+    # a free slot in the attribute columns
+    def _new_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+        self._weights.append(0.0)
+        self._prices.append(0.0)
+        self._base_prices.append(0.0)
+        self._durations.append(0)
+        self._primary.append(0)
+        self._airlines.append('')
+        self._flight_objects.append(None)
+        self._flight_ids.append(-1)
+        return len(self._weights) - 1
+    
+    # drop stored flights no edge points to any more, once they outnumber the live ones
+    def _compact_flight_store(self) -> None:
+        if len(self.flight_store) <= 2 * self._edge_count:
+            return
+        slots = [slot for targets in self._adjacency.values() for slot in targets.values()]
+        flight_ids = np.array([self._flight_ids[slot] for slot in slots], dtype=np.int64)
+        order = np.argsort(flight_ids, kind='stable')
+        self.flight_store = self.flight_store.take(flight_ids[order])
+        new_ids = np.empty(len(order), dtype=np.int64)
+        new_ids[order] = np.arange(len(order))
+        for slot, flight_id in zip(slots, new_ids.tolist()):
+            self._flight_ids[slot] = flight_id
+    
+    # gather the live slots in adjacency order into a CSRGraph
+    def _compile(self) -> CSRGraph:
+        node_ids = {code: node for node, code in enumerate(self.city_nodes)}
+        slots = np.fromiter((slot for targets in self._adjacency.values() for slot in targets.values()),
+                            dtype=np.int64, count=self._edge_count)
+        targets = np.fromiter((node_ids[dest] for targets in self._adjacency.values() for dest in targets),
+                              dtype=np.int32, count=self._edge_count)
+        sources = np.repeat(np.arange(len(node_ids), dtype=np.int64),
+                            [len(self._adjacency[code]) for code in self.city_nodes])
+        slot_list = slots.tolist()
+        return CSRGraph.from_edges(
+            nodes=list(self.city_nodes),
+            cities=list(self.city_nodes.values()),
+            sources=sources,
+            targets=targets,
+            weights=np.array(self._weights, dtype=np.float64)[slots],
+            prices=np.array(self._prices, dtype=np.float64)[slots],
+            base_prices=np.array(self._base_prices, dtype=np.float64)[slots],
+            airlines=[self._airlines[slot] for slot in slot_list],
+            duration_minutes=np.array(self._durations, dtype=np.int64)[slots],
+            is_primary=np.array(self._primary, dtype=bool)[slots],
+            flight_objects=None if self.lean else [self._flight_objects[slot] for slot in slot_list],
+            flight_ids=np.array(self._flight_ids, dtype=np.int64)[slots] if self.lean else None
+        )
+    
+    # fold a graph built from a later part of the same input into this one.
+    # merging partial graphs in input order gives the same nodes, edges and
+    # ordering as inserting every flight into a single graph
+    def merge(self, other: 'FlightGraph') -> None:
+        for city in other.city_nodes.values():
+            self._add_city_node(city)
+        
+        winners = [(source, dest, data) for source, dest, data in other.edges()
+                   if self._beats_edge(source, dest, data['weight'])]
         
-        # keep only the cheapest flight between each city pair
-        if self.graph.has_edge(source.code, destination.code):
-            existing_weight = self.graph[source.code][destination.code]['weight']
-            # replace if this flight is cheaper
-            if weight < existing_weight:
-                self.graph.add_edge(source.code, destination.code, **edge_data)
+        # flights move with their edges, into this graph's store when it is lean
+        if self.lean and other.lean:
+            flight_ids = self.flight_store.extend(other.flight_store, [data['flight_id'] for _, _, data in winners])
+        elif self.lean:
+            flight_ids = self.flight_store.add([data['flight_object'] for _, _, data in winners],
+                                               np.arange(len(winners)))
+        for position, (source, dest, data) in enumerate(winners):
+            if self.lean:
+                data.pop('flight_object', None)
+                data['flight_id'] = int(flight_ids[position])
+            elif other.lean:
+                data['flight_object'] = other.flight_store.processed_flight(data.pop('flight_id'))
+            self.set_edge(source, dest, data)
+        
+        if self.lean:
+            self._compact_flight_store()
         else:
-            # first flight between these cities
-            self.graph.add_edge(source.code, destination.code, **edge_data)
+            self.flight_edges.extend(other.flight_edges)
+            self.flight_tables.extend(other.flight_tables)
+        if other._fare_batches:
+            self._fare_batches.extend(other._fare_batches)
+            self._fare_index = None
+
+
+# processed flight of every recorded fare, built on request from the batch it came from
+class _FareFlights:
     
+    def __init__(self, rows: List[np.ndarray], sources: List):
+        self.rows = rows            # per batch, flight row of each fare
+        self.sources = sources      # per batch, the FlightTable or processed flight list
+        self.offsets = np.cumsum([0] + [len(batch_rows) for batch_rows in rows])
+    
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+    
+    def __getitem__(self, fare_id: int) -> ProcessedFlight:
+        batch = int(np.searchsorted(self.offsets, fare_id, side='right')) - 1
+        row = int(self.rows[batch][fare_id - self.offsets[batch]])
+        source = self.sources[batch]
+        if isinstance(source, FlightTable):
+            return source.processed_flight(row)
+        return source[row]
+
+
+# flights behind the edges of a lean graph. only rows that edges point to are kept, as
+# row subsets of their flight tables (or the flight objects of list input), and a
+# processed flight is built only when it is asked for
+class FlightStore:
+    
+    def __init__(self):
+        self._chunks: List[Union[FlightTable, List[ProcessedFlight]]] = []
+        self._offsets: List[int] = [0]      # first flight id of each chunk, plus the total
+    
+    def __len__(self) -> int:
+        return self._offsets[-1]
+    
+    # keep the given rows of a flight table or flight list, returns their flight ids
+    def add(self, source: Union[FlightTable, List[ProcessedFlight]], rows: np.ndarray) -> np.ndarray:
+        start = len(self)
+        if len(rows):
+            if isinstance(source, FlightTable):
+                self._chunks.append(source.take(rows))
+            else:
+                self._chunks.append([source[row] for row in rows.tolist()])
+            self._offsets.append(start + len(rows))
+        return np.arange(start, start + len(rows), dtype=np.int64)
+    
+    # copy flights from another store, returns their ids in this one
+    def extend(self, other: 'FlightStore', flight_ids: List[int]) -> np.ndarray:
+        start = len(self)
+        for chunk in other.take(flight_ids)._chunks:
+            self._chunks.append(chunk)
+            self._offsets.append(self._offsets[-1] + len(chunk))
+        return np.arange(start, len(self), dtype=np.int64)
+    
+    # a new store holding just the given flights, in the given order
+    def take(self, flight_ids) -> 'FlightStore':
+        store = FlightStore()
+        flight_ids = np.asarray(flight_ids, dtype=np.int64)
+        chunks = np.searchsorted(self._offsets, flight_ids, side='right') - 1
+        
+        # each run of ids from the same chunk becomes one chunk of the new store
+        run_starts = np.flatnonzero(np.diff(chunks, prepend=-1)).tolist()
+        for start, end in zip(run_starts, run_starts[1:] + [len(flight_ids)]):
+            chunk = int(chunks[start])
+            store.add(self._chunks[chunk], flight_ids[start:end] - self._offsets[chunk])
+        return store
+    
+    # processed flight behind one flight id
+    def processed_flight(self, flight_id: int) -> ProcessedFlight:
+        chunk = int(np.searchsorted(self._offsets, flight_id, side='right')) - 1
+        source = self._chunks[chunk]
+        row = int(flight_id - self._offsets[chunk])
+        if isinstance(source, FlightTable):
+            return source.processed_flight(row)
+        return source[row]
+
+
+
+# every route segment of every flight in a table, in the order the graph inserts them
+@dataclass
+class SegmentTable:
+    rows: np.ndarray                # int64 table row the segment belongs to
+    source_ids: np.ndarray          # int32 city id the segment leaves from
+    destination_ids: np.ndarray     # int32 city id the segment arrives at
+    is_primary: np.ndarray          # bool, first segment of its flight
+    pair_ids: np.ndarray            # int64 city pair id, numbered by first appearance
+    pair_source_ids: np.ndarray     # int32 source city id of each pair
+    pair_destination_ids: np.ndarray  # int32 destination city id of each pair
+    pair_order: np.ndarray          # int64 segment indexes grouped by pair, in segment order
+    pair_starts: np.ndarray         # int64 start of each pair's group in pair_order
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    @property
+    def pair_count(self) -> int:
+        return len(self.pair_source_ids)
+
+
+# split every flight of a table into its route segments, as arrays
+def explode_segments(table: FlightTable) -> SegmentTable:
+    # segments per flight: one less than the cities on its route
+    route_lengths = np.diff(table.route_offsets)
+    segment_counts = np.maximum(route_lengths - 1, 0)[table.route_ids]
+    rows = np.repeat(np.arange(len(table), dtype=np.int64), segment_counts)
+    
+    # position of each segment within its flight, and where its cities sit in route_city_ids
+    first_segments = np.cumsum(segment_counts) - segment_counts
+    positions = np.arange(len(rows)) - np.repeat(first_segments, segment_counts)
+    city_positions = table.route_offsets[table.route_ids[rows]] + positions
+    source_ids = table.route_city_ids[city_positions]
+    destination_ids = table.route_city_ids[city_positions + 1]
+    return group_segments(rows, source_ids, destination_ids, positions == 0, len(table.cities))
+
+
+# number the city pairs of a list of segments by first appearance and group segments by pair
+def group_segments(rows: np.ndarray, source_ids: np.ndarray, destination_ids: np.ndarray,
+                   is_primary: np.ndarray, city_count: int) -> SegmentTable:
+    # number city pairs by first appearance
+    city_count = max(city_count, 1)
+    pair_ids, pair_keys = pd.factorize(source_ids.astype(np.int64) * city_count + destination_ids)
+    
+    # group segments by pair once, so picking the cheapest per pair needs no sort
+    pair_order = np.argsort(pair_ids, kind='stable')
+    pair_starts = np.searchsorted(pair_ids[pair_order], np.arange(len(pair_keys)))
+    return SegmentTable(
+        rows=rows,
+        source_ids=source_ids,
+        destination_ids=destination_ids,
+        is_primary=is_primary,
+        pair_ids=pair_ids.astype(np.int64),
+        pair_source_ids=(pair_keys // city_count).astype(np.int32),
+        pair_destination_ids=(pair_keys % city_count).astype(np.int32),
+        pair_order=pair_order.astype(np.int64),
+        pair_starts=pair_starts.astype(np.int64)
+    )
+
+
+# graph weight of every segment: its flight's final price plus the duration penalty
+def segment_weights(table: FlightTable, segments: SegmentTable,
+                    final_prices: np.ndarray = None) -> np.ndarray:
+    final_prices = table.final_prices if final_prices is None else final_prices
+    return calculate_weighted_price(final_prices, table.duration_minutes)[segments.rows]
+
+
+# index of the cheapest segment for each city pair, in pair order: one grouped argmin.
+# ties go to the earliest segment, same as the strict < in _beats_edge
+def cheapest_segments(segments: SegmentTable, weights: np.ndarray) -> np.ndarray:
+    if len(segments) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    # lowest weight of each pair's group
+    grouped_weights = weights[segments.pair_order]
+    group_sizes = np.diff(np.append(segments.pair_starts, len(grouped_weights)))
+    lowest = np.minimum.reduceat(grouped_weights, segments.pair_starts)
+    is_lowest = grouped_weights == np.repeat(lowest, group_sizes)
+    
+    # groups keep segment order, so the first lowest position is the earliest segment
+    positions = np.where(is_lowest, np.arange(len(grouped_weights)), len(grouped_weights))
+    return segments.pair_order[np.minimum.reduceat(positions, segments.pair_starts)]
+
+
+# city ids in the order flights add nodes: per flight the source,
+# the destination, then the intermediate stops
+def city_insertion_order(table: FlightTable) -> List[int]:
+    route_ids, first_rows = np.unique(table.route_ids, return_index=True)
+    seen: Dict[int, None] = {}
+    for route_id in route_ids[np.argsort(first_rows)].tolist():
+        city_ids = table.route_cities(route_id).tolist()
+        for city_id in [city_ids[0], city_ids[-1]] + city_ids[1:-1]:
+            seen.setdefault(city_id, None)
+    return list(seen)
+
+
+# edges converted from the graph arrays at a time while streaming exports
+EXPORT_BATCH_SIZE = 65536
+
+# shared encoders for pretty-printed and ndjson records
+_RECORD_ENCODER = json.JSONEncoder(indent=2)
+_NDJSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+# write items as a json array a batch at a time, producing the same text as
+# json.dumps(list(items), indent=2) would for an array nested `level` deep
+def _write_json_array(f: TextIO, items: Iterable, level: int = 0,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> None:
+    items = iter(items)
+    empty = True
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        # each batch encodes as '[\n  item,\n  item\n]': keep the items, drop the closing line.
+        # json escapes newlines inside strings, so every newline here is a line break
+        text = _RECORD_ENCODER.encode(batch)
+        if level:
+            text = text.replace('\n', '\n' + '  ' * level)
+        f.write(text[:text.rindex('\n')] if empty else ',' + text[1:text.rindex('\n')])
+        empty = False
+    f.write('[]' if empty else '\n' + '  ' * level + ']')
 
 
 # exports graph data in 3 formats for different algorithms
 class GraphExporter:
     
-    def __init__(self, flight_graph: FlightGraph):
-        # store references to the graph data
+    def __init__(self, flight_graph: Union[FlightGraph, CSRGraph]):
+        # store references to the graph data, a compiled graph is exported as it is
         self.flight_graph = flight_graph
-        self.graph = flight_graph.graph
+        self.graph = flight_graph if isinstance(flight_graph, CSRGraph) else flight_graph.csr
     
     # export for dijkstra's algorithm: {source: {destination: weight}}
     def export_for_dijkstra(self, output_file: str) -> None:
-        dijkstra_graph = {}
-        
-        # initialize empty adjacency list for each city
-        for node in self.graph.nodes():
-            dijkstra_graph[node] = {}
-        
-        # add edges with weights to adjacency list format
-        for source, dest, data in self.graph.edges(data=True):
-            dijkstra_graph[source][dest] = data['weight']
-        
-        # save as json file
-        with open(output_file, 'w') as f:
-            json.dump(dijkstra_graph, f, indent=2)
+        self._write_json(output_file, self.dijkstra_data())
     
-    # export for bellman-ford algorithm: {nodes: [...], edges: [[source, dest, weight], ...]}
+    # export for bellman-ford algorithm: {nodes: [...], edges: [[source, dest, weight], ...]}.
+    # edges are streamed from the graph arrays, the file matches bellman_ford_data() dumped at once
     def export_for_bellman_ford(self, output_file: str) -> None:
-        # get all city nodes as a list
-        nodes = list(self.graph.nodes())
-        # convert edges to [source, destination, weight] format
-        edges = [[source, dest, data['weight']] for source, dest, data in self.graph.edges(data=True)]
-        
-        # package in bellman-ford expected format
-        result = {'nodes': nodes, 'edges': edges}
-        
-        # save as json file
         with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
-    
-    # export detailed edge list for dynamic programming with constraints
-    def export_edge_list(self, output_file: str) -> None:
-        edges = []
-        
-        # create detailed edge objects with all constraint data
-        for source, dest, data in self.graph.edges(data=True):
-            edge = {
-                'source': source,
-                'destination': dest,
-                'weight': data['weight'],              # final discounted weight
-                'price': data['price'],               # discounted price
-                'airline': data['airline'],           # airline name
-                'duration_minutes': data['duration_minutes'],  # flight duration
-                'stops': data['stops']                # number of stops
-            }
-            edges.append(edge)
+            f.write('{\n  "nodes": ')
+            _write_json_array(f, self.graph.nodes, level=1)
+            f.write(',\n  "edges": ')
+            _write_json_array(f, self.iter_bellman_ford_edges(), level=1)
+            f.write('\n}')
+    
+    # export detailed edge list for dynamic programming with constraints, streamed from
+    # the graph arrays. as a json array by default, or one compact record per line (ndjson)
+    def export_edge_list(self, output_file: str, ndjson: bool = False) -> None:
+        with open(output_file, 'w') as f:
+            if not ndjson:
+                _write_json_array(f, self.iter_edge_list())
+                return
+            for edge in self.iter_edge_list():
+                f.write(_NDJSON_ENCODER.encode(edge))
+                f.write('\n')
+    
+    # write the graph artifact: one versioned file that dijkstra, bellman-ford and
+    # dynamic programming all memory-map, each through its own view
+    def export_binary(self, output_file: str) -> None:
+        write_graph_artifact(output_file, self.graph)
+    
+    # compiled graph arrays in the graph_artifact layout
+    def binary_data(self) -> bytes:
+        return graph_artifact_bytes(self.graph)
+    
+    # adjacency list with weights for dijkstra
+    def dijkstra_data(self) -> Dict:
+        nodes = self.graph.nodes
+        offsets = self.graph.offsets.tolist()
+        targets = self.graph.targets.tolist()
+        weights = self.graph.weights.tolist()
         
-        # save as json array
+        # one row of the offset array per city, empty for cities with no departures
+        return {
+            node: {nodes[targets[edge]]: weights[edge] for edge in range(offsets[i], offsets[i + 1])}
+            for i, node in enumerate(nodes)
+        }
+    
+    # node list plus [source, destination, weight] edges for bellman-ford
+    def bellman_ford_data(self) -> Dict:
+        # package in bellman-ford expected format
+        return {'nodes': list(self.graph.nodes), 'edges': list(self.iter_bellman_ford_edges())}
+    
+    # detailed edge objects with all constraint data for dynamic programming
+    def edge_list_data(self) -> List[Dict]:
+        return list(self.iter_edge_list())
+    
+    # edges in [source, destination, weight] format, in adjacency order
+    def iter_bellman_ford_edges(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+        nodes = self.graph.nodes
+        for sources, targets, weights in self._edge_batches(batch_size, 'targets', 'weights'):
+            for source, target, weight in zip(sources, targets, weights):
+                yield [nodes[source], nodes[target], weight]
+    
+    # detailed edge objects in adjacency order, only one batch of edges is converted at a time
+    def iter_edge_list(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict]:
+        graph = self.graph
+        nodes = graph.nodes
+        for columns in self._edge_batches(batch_size, 'targets', 'weights', 'prices',
+                                          'airline_ids', 'duration_minutes'):
+            # create detailed edge objects with all constraint data
+            for source, target, weight, price, airline_id, duration_minutes in zip(*columns):
+                yield {
+                    'source': nodes[source],
+                    'destination': nodes[target],
+                    'weight': weight,                           # final discounted weight
+                    'price': price,                             # discounted price
+                    'airline': graph.airlines[airline_id],      # airline name
+                    'duration_minutes': duration_minutes,       # flight duration
+                    'stops': 0                                  # direct segment = 0 stops
+                }
+    
+    # (sources, *columns) as python lists, batch_size edges at a time
+    def _edge_batches(self, batch_size: int, *columns: str) -> Iterator[Tuple[list, ...]]:
+        graph = self.graph
+        offsets = graph.offsets
+        node_ids = np.arange(graph.number_of_nodes(), dtype=np.int32)
+        for start in range(0, graph.number_of_edges(), batch_size):
+            end = min(start + batch_size, graph.number_of_edges())
+            # source of each edge in the batch from the offsets, without expanding all sources
+            first = np.searchsorted(offsets, start, side='right') - 1
+            last = np.searchsorted(offsets, end, side='left')
+            counts = np.diff(np.clip(offsets[first:last + 1], start, end))
+            sources = np.repeat(node_ids[first:last], counts)
+            yield (sources.tolist(), *(getattr(graph, column)[start:end].tolist() for column in columns))
+    
+    # serialize export data exactly as it is written to disk
+    @staticmethod
+    def to_json(data) -> str:
+        return json.dumps(data, indent=2)
+    
+    # save data as a json file
+    def _write_json(self, output_file: str, data) -> None:
         with open(output_file, 'w') as f:
-            json.dump(edges, f, indent=2)
\ No newline at end of file
+            f.write(self.to_json(data))
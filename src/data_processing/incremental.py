@@ -0,0 +1,301 @@
+# incremental ingestion: apply csv deltas of added, removed or changed flights
+# to an existing graph without rebuilding it from the full dataset
+
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple, Optional
+import pandas as pd
+from .data_processor import FlightDataCleaner, RouteParser, DiscountEngine
+from .graph_builder import FlightGraph, GraphExporter
+from .graph_artifact import write_file_atomic
+from .models import Discount, ProcessedFlight
+from .utils import (
+    flight_duration_minutes, calculate_weighted_price, clean_airline_column, normalize_city_column
+)
+from .config import REALISTIC_DISCOUNTS
+
+# columns that identify a fare, a "change" row replaces the price of a matching fare
+FLIGHT_KEY_COLUMNS: List[str] = [
+    'Airline', 'Date_of_Journey', 'Source', 'Destination', 'Route',
+    'Dep_Time', 'Arrival_Time', 'Duration', 'Total_Stops', 'Additional_Info'
+]
+
+# delta files carry one extra column saying what to do with each row
+CHANGE_COLUMN = 'Change'
+ADD, REMOVE, CHANGE = 'add', 'remove', 'change'
+
+# artifacts written by process_data.py, name -> exporter method producing its data
+GRAPH_ARTIFACTS: Dict[str, str] = {
+    'graph.bin': 'binary_data'
+}
+
+# legacy per-algorithm json files, written as well when json exports are asked for
+JSON_ARTIFACTS: Dict[str, str] = {
+    'graph_dijkstra.json': 'dijkstra_data',
+    'graph_bellman_ford.json': 'bellman_ford_data',
+    'graph_edge_list.json': 'edge_list_data'
+}
+
+MANIFEST_FILE = 'ingest_manifest.json'
+STATE_FILE = 'ingest_state.pkl'
+
+# bump when the pickled graph state changes shape, older states are rebuilt
+STATE_FORMAT_VERSION = 3
+
+
+# flight graph that remembers every fare on every city pair, so a delta only
+# recomputes the cheapest edge of the pairs it touches. the edge kept for a pair
+# is the lowest weight, earliest row fare, the same one a full rebuild keeps
+class IncrementalFlightGraph:
+
+    def __init__(self, discounts: List[Discount] = None):
+        self.cleaner = FlightDataCleaner(verbose=False)
+        self.parser = RouteParser(verbose=False)
+        self.discount_engine = DiscountEngine(discounts or REALISTIC_DISCOUNTS, verbose=False)
+        self.flight_graph = FlightGraph(verbose=False)
+        
+        # fare id -> (key, processed flight, segments as (source, dest, is_primary))
+        self._fares: Dict[int, Tuple[tuple, ProcessedFlight, List[Tuple[str, str, bool]]]] = {}
+        self._fares_by_key: Dict[tuple, List[int]] = {}                 # active fare ids in row order
+        self._pair_fares: Dict[Tuple[str, str], Dict[int, Tuple[float, bool]]] = {}  # fare id -> weight
+        self._next_fare_id = 0
+    
+    # load the full base dataset as if every row were an add
+    def load_base(self, df: pd.DataFrame) -> int:
+        self.apply_delta(df.assign(**{CHANGE_COLUMN: ADD}))
+        return len(self._fares)
+    
+    # apply one delta dataframe in row order, returns the city pairs whose edge changed
+    def apply_delta(self, delta_df: pd.DataFrame) -> List[Tuple[str, str]]:
+        delta_df = delta_df.reset_index(drop=True)
+        operations = delta_df[CHANGE_COLUMN].astype(str).str.strip().str.lower()
+        unknown = ~operations.isin([ADD, REMOVE, CHANGE])
+        if unknown.any():
+            raise ValueError(f"Unknown {CHANGE_COLUMN} values: {sorted(operations[unknown].unique())}")
+        keys = self._flight_keys(delta_df)
+        
+        # clean, parse and discount the rows that carry a fare (removals only need a key)
+        upserts = delta_df[operations != REMOVE].assign(_delta_row=delta_df.index[operations != REMOVE])
+        cleaned_df, _ = self.cleaner.clean_dataset_vectorized(upserts)
+        flights_by_row = {
+            row: flight
+            for row, (_, flight, _) in zip(cleaned_df['_delta_row'], self.parser.iter_flight_rows(cleaned_df))
+            if flight is not None
+        }
+        processed_by_row = dict(zip(
+            flights_by_row, self.discount_engine.apply_discounts(list(flights_by_row.values()))
+        ))
+        
+        touched: Dict[Tuple[str, str], None] = {}   # ordered set of pairs to recompute
+        unmatched = 0
+        for row, (operation, key) in enumerate(zip(operations, keys)):
+            processed_flight = processed_by_row.get(row)
+            if operation == ADD:
+                if processed_flight is not None:
+                    self._insert_fare(self._next_fare_id, key, processed_flight, touched)
+                    self._next_fare_id += 1
+                continue
+            
+            # remove and change act on the earliest active fare with the same key
+            fare_ids = self._fares_by_key.get(key)
+            if not fare_ids:
+                unmatched += 1
+                continue
+            fare_id = fare_ids[0]
+            self._delete_fare(fare_id, touched)
+            
+            # a changed fare keeps its row position, like editing the base file in place
+            if operation == CHANGE and processed_flight is not None:
+                self._insert_fare(fare_id, key, processed_flight, touched)
+                self._fares_by_key[key].sort()
+        
+        if unmatched:
+            print(f"Ignored {unmatched} remove/change rows with no matching flight")
+        
+        changed_pairs = [pair for pair in touched if self._refresh_edge(pair)]
+        self._drop_isolated_cities(touched)
+        return changed_pairs
+    
+    # add one fare and remember which pairs it touches
+    def _insert_fare(self, fare_id: int, key: tuple, processed_flight: ProcessedFlight,
+                     touched: Dict) -> None:
+        flight = processed_flight.original_flight
+        duration_minutes = flight_duration_minutes(flight)
+        weight = calculate_weighted_price(processed_flight.final_price, duration_minutes)
+        
+        # add cities in the same order as FlightGraph._add_flights_bulk
+        route = flight.route
+        for city in [route.source, route.destination] + list(route.intermediate_stops):
+            self.flight_graph._add_city_node(city)
+        
+        all_cities = route.all_cities
+        segments = []
+        for i in range(len(all_cities) - 1):
+            pair = (all_cities[i].code, all_cities[i + 1].code)
+            segments.append((pair[0], pair[1], i == 0))
+            # first segment wins if a route visits the same pair twice
+            self._pair_fares.setdefault(pair, {}).setdefault(fare_id, (weight, i == 0))
+            touched[pair] = None
+        
+        self._fares[fare_id] = (key, processed_flight, segments)
+        self._fares_by_key.setdefault(key, []).append(fare_id)
+    
+    # drop one fare from every pair it was on
+    def _delete_fare(self, fare_id: int, touched: Dict) -> None:
+        key, _, segments = self._fares.pop(fare_id)
+        self._fares_by_key[key].remove(fare_id)
+        if not self._fares_by_key[key]:
+            del self._fares_by_key[key]
+        
+        for source, dest, _ in segments:
+            self._pair_fares.get((source, dest), {}).pop(fare_id, None)
+            touched[(source, dest)] = None
+    
+    # recompute the cheapest edge of one pair, returns true if the graph changed
+    def _refresh_edge(self, pair: Tuple[str, str]) -> bool:
+        graph = self.flight_graph
+        fares = self._pair_fares.get(pair)
+        existing = graph.get_edge_data(*pair)
+        
+        if not fares:
+            # no fares left on this pair
+            self._pair_fares.pop(pair, None)
+            if existing is None:
+                return False
+            graph.remove_edge(*pair)
+            return True
+        
+        # cheapest weight, earliest fare on ties
+        fare_id = min(fares, key=lambda candidate: (fares[candidate][0], candidate))
+        weight, is_primary = fares[fare_id]
+        processed_flight = self._fares[fare_id][1]
+        if (existing is not None and existing['flight_object'] is processed_flight
+                and existing['is_primary_segment'] == is_primary):
+            return False
+        
+        duration_minutes = flight_duration_minutes(processed_flight.original_flight)
+        graph.set_edge(*pair, graph._edge_data(
+            processed_flight, weight, duration_minutes, is_primary
+        ))
+        return True
+    
+    # cities with no flights left disappear, as they would in a full rebuild
+    def _drop_isolated_cities(self, pairs) -> None:
+        graph = self.flight_graph
+        for pair in pairs:
+            for code in pair:
+                if code in graph.city_nodes and graph.degree(code) == 0:
+                    graph.remove_city(code)
+    
+    # identity of every raw row, with airline and cities normalized like the cleaner does
+    def _flight_keys(self, df: pd.DataFrame) -> List[tuple]:
+        key_columns = []
+        for column in FLIGHT_KEY_COLUMNS:
+            if column not in df.columns:
+                key_columns.append(["nan"] * len(df))
+                continue
+            values = df[column].astype(object).where(df[column].notna(), "nan").astype(str)
+            if column == 'Airline':
+                values = clean_airline_column(values)
+            elif column in ('Source', 'Destination'):
+                values = normalize_city_column(values, self.cleaner.city_mappings)
+            key_columns.append(values.tolist())
+        return list(zip(*key_columns))
+
+
+# sha256 of a file's bytes, read in blocks
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# keeps an IncrementalFlightGraph, its exported artifacts and a manifest of applied inputs in sync
+class IncrementalIngestor:
+
+    def __init__(self, output_dir: str, discounts: List[Discount] = None, json_exports: bool = False):
+        self.output_dir = output_dir
+        self.discounts = discounts or REALISTIC_DISCOUNTS
+        self.artifacts = {**GRAPH_ARTIFACTS, **(JSON_ARTIFACTS if json_exports else {})}
+        self.manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.manifest = self._read_manifest()
+        self.state: Optional[IncrementalFlightGraph] = None
+    
+    # load saved state for this base file, or build it from scratch
+    def load_base(self, base_file: str) -> None:
+        base_hash = file_sha256(base_file)
+        base = self.manifest.get('base') or {}
+        
+        if (base.get('sha256') == base_hash and base.get('state_version') == STATE_FORMAT_VERSION
+                and os.path.exists(self.state_path)):
+            with open(self.state_path, 'rb') as f:
+                self.state = pickle.load(f)
+            print(f"Loaded saved graph state ({len(self.manifest['applied_deltas'])} deltas applied)")
+            return
+        
+        # new or changed base: start over
+        print("Building graph state from base file...")
+        self.state = IncrementalFlightGraph(self.discounts)
+        rows = self.state.load_base(pd.read_csv(base_file))
+        self.manifest = {
+            'base': {'path': base_file, 'sha256': base_hash, 'state_version': STATE_FORMAT_VERSION},
+            'applied_deltas': [],
+            'artifacts': {}
+        }
+        print(f"Base graph built from {rows} flights")
+    
+    # apply a delta file unless the manifest says it was already applied
+    def apply_delta_file(self, delta_file: str) -> List[Tuple[str, str]]:
+        delta_hash = file_sha256(delta_file)
+        if any(entry['sha256'] == delta_hash for entry in self.manifest['applied_deltas']):
+            print(f"Skipping {delta_file}: already applied")
+            return []
+        
+        delta_df = pd.read_csv(delta_file)
+        changed_pairs = self.state.apply_delta(delta_df)
+        self.manifest['applied_deltas'].append({
+            'path': delta_file,
+            'sha256': delta_hash,
+            'rows': len(delta_df),
+            'changed_pairs': len(changed_pairs),
+            'applied_at': datetime.now(timezone.utc).isoformat()
+        })
+        print(f"Applied {delta_file}: {len(delta_df)} rows, {len(changed_pairs)} routes changed")
+        return changed_pairs
+    
+    # write only the artifacts whose content changed, then save state and manifest
+    def export(self) -> List[str]:
+        exporter = GraphExporter(self.state.flight_graph)
+        written = []
+        
+        for name, method in self.artifacts.items():
+            content = getattr(exporter, method)()
+            if not isinstance(content, bytes):
+                content = exporter.to_json(content).encode()
+            content_hash = hashlib.sha256(content).hexdigest()
+            path = os.path.join(self.output_dir, name)
+            
+            if self.manifest['artifacts'].get(name) == content_hash and os.path.exists(path):
+                continue
+            write_file_atomic(path, content)
+            self.manifest['artifacts'][name] = content_hash
+            written.append(name)
+        
+        with open(self.state_path, 'wb') as f:
+            pickle.dump(self.state, f)
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        return written
+    
+    # read the manifest from the output directory, if there is one
+    def _read_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {'base': None, 'applied_deltas': [], 'artifacts': {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
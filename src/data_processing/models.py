@@ -1,6 +1,7 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Iterator, Tuple, FrozenSet
 from enum import Enum
+import numpy as np
 
 
 # flight stop categories for route parsing
@@ -50,6 +51,9 @@ class Flight:
     duration: str           # flight duration
     additional_info: str    # extra flight details
     base_price: float       # original price before discounts
+    # typed values parsed during cleaning, None when the flight was built without them
+    duration_minutes: Optional[int] = None  # duration in minutes
+    stops_count: Optional[int] = None       # number of stops
 
 
 # discount configuration with calculation logic
@@ -62,16 +66,20 @@ class Discount:
     applicable_airlines: List[str]      # empty list means all airlines
     
     def calculate_discount(self, flight: Flight) -> float:
+        return self.discount_for(flight.airline, flight.base_price)
+    
+    # discount amount for a fare given just its airline and base price
+    def discount_for(self, airline: str, base_price: float) -> float:
         # check if discount applies to this airline
-        if self.applicable_airlines and flight.airline not in self.applicable_airlines:
+        if self.applicable_airlines and airline not in self.applicable_airlines:
             return 0.0
         
         # calculate total discount from percentage + fixed amount
-        percentage_discount = flight.base_price * (self.percentage / 100)
+        percentage_discount = base_price * (self.percentage / 100)
         total_discount = percentage_discount + self.fixed_amount
         
         # cap discount at 50% to prevent negative prices
-        max_discount = flight.base_price * 0.5
+        max_discount = base_price * 0.5
         return min(total_discount, max_discount)
 
 
@@ -79,4 +87,193 @@ class Discount:
 @dataclass
 class ProcessedFlight:
     original_flight: Flight    # original flight data
-    final_price: float         # price after best discount applied
\ No newline at end of file
+    final_price: float         # price after best discount applied
+
+
+# compact variants of the models above: same fields and behaviour, but slotted
+# (no per-instance __dict__) and frozen so one instance can be shared by many flights
+
+@dataclass(frozen=True, slots=True)
+class CompactCity:
+    code: str
+    name: str
+    normalized_name: str
+    
+    @classmethod
+    def from_city(cls, city: City) -> 'CompactCity':
+        return cls(code=city.code, name=city.name, normalized_name=city.normalized_name)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactRoute:
+    source: CompactCity
+    destination: CompactCity
+    intermediate_stops: Tuple[CompactCity, ...]
+    total_stops: StopType
+    # full city sequence, built once instead of on every access
+    all_cities: Tuple[CompactCity, ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'all_cities',
+                           (self.source, *self.intermediate_stops, self.destination))
+
+
+@dataclass(frozen=True, slots=True)
+class CompactFlight:
+    airline: str
+    date_of_journey: str
+    route: CompactRoute
+    departure_time: str
+    arrival_time: str
+    duration: str
+    additional_info: str
+    base_price: float
+    duration_minutes: Optional[int] = None
+    stops_count: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class CompactDiscount:
+    discount_type: DiscountType
+    name: str
+    percentage: float
+    fixed_amount: float
+    applicable_airlines: FrozenSet[str]  # empty set means all airlines
+    
+    def calculate_discount(self, flight: Flight) -> float:
+        return self.discount_for(flight.airline, flight.base_price)
+    
+    # same rule as Discount.discount_for with a set membership test
+    def discount_for(self, airline: str, base_price: float) -> float:
+        if self.applicable_airlines and airline not in self.applicable_airlines:
+            return 0.0
+        total_discount = base_price * (self.percentage / 100) + self.fixed_amount
+        return min(total_discount, base_price * 0.5)
+    
+    @classmethod
+    def from_discount(cls, discount: Discount) -> 'CompactDiscount':
+        return cls(
+            discount_type=discount.discount_type,
+            name=discount.name,
+            percentage=discount.percentage,
+            fixed_amount=discount.fixed_amount,
+            applicable_airlines=frozenset(discount.applicable_airlines)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompactProcessedFlight:
+    original_flight: CompactFlight
+    final_price: float
+
+
+# stop types in the order used by FlightTable.route_stop_types
+STOP_TYPES: List[StopType] = list(StopType)
+
+
+# all flights stored column by column (struct of arrays) instead of one object per row.
+# strings are dictionary-encoded: *_ids arrays index into the matching vocabulary list.
+# Flight and ProcessedFlight objects are built on demand as views of single rows
+@dataclass
+class FlightTable:
+    base_prices: np.ndarray         # float64 price before discounts
+    duration_minutes: np.ndarray    # int32 parsed flight duration
+    departure_times: np.ndarray     # int16 clock time as HHMM, -1 if unparsed
+    arrival_times: np.ndarray       # int16 clock time as HHMM, -1 if unparsed
+    airline_ids: np.ndarray         # int32 index into airlines
+    source_ids: np.ndarray          # int32 index into cities
+    destination_ids: np.ndarray     # int32 index into cities
+    route_ids: np.ndarray           # int32 index into the route arrays below
+    date_ids: np.ndarray            # int32 index into dates
+    duration_text_ids: np.ndarray   # int32 index into duration_texts
+    info_ids: np.ndarray            # int32 index into infos
+    
+    # distinct routes: route r visits route_city_ids[route_offsets[r]:route_offsets[r + 1]]
+    route_offsets: np.ndarray       # int64, one more entry than there are routes
+    route_city_ids: np.ndarray      # int32 full city sequence, source first
+    route_stop_types: np.ndarray    # int8 index into STOP_TYPES
+    
+    airlines: List[str]             # airline names
+    cities: List[City]              # shared city objects
+    dates: List[str]                # travel dates
+    duration_texts: List[str]       # raw duration strings like '2h 50m'
+    infos: List[str]                # additional info strings
+    
+    final_prices: Optional[np.ndarray] = None  # float64, filled in by DiscountEngine
+    
+    def __len__(self) -> int:
+        return len(self.base_prices)
+    
+    def __getitem__(self, row: int) -> Flight:
+        return self.flight(row)
+    
+    def __iter__(self) -> Iterator[Flight]:
+        for row in range(len(self)):
+            yield self.flight(row)
+    
+    # a table holding only the given rows, sharing the route arrays and lookup lists
+    def take(self, rows: np.ndarray) -> 'FlightTable':
+        return replace(
+            self,
+            base_prices=self.base_prices[rows],
+            duration_minutes=self.duration_minutes[rows],
+            departure_times=self.departure_times[rows],
+            arrival_times=self.arrival_times[rows],
+            airline_ids=self.airline_ids[rows],
+            source_ids=self.source_ids[rows],
+            destination_ids=self.destination_ids[rows],
+            route_ids=self.route_ids[rows],
+            date_ids=self.date_ids[rows],
+            duration_text_ids=self.duration_text_ids[rows],
+            info_ids=self.info_ids[rows],
+            final_prices=None if self.final_prices is None else self.final_prices[rows]
+        )
+    
+    # city ids along a route, source first and destination last
+    def route_cities(self, route_id: int) -> np.ndarray:
+        return self.route_city_ids[self.route_offsets[route_id]:self.route_offsets[route_id + 1]]
+    
+    # build a route object for one distinct route
+    def route(self, route_id: int) -> Route:
+        city_ids = self.route_cities(route_id)
+        return Route(
+            source=self.cities[city_ids[0]],
+            destination=self.cities[city_ids[-1]],
+            intermediate_stops=[self.cities[city_id] for city_id in city_ids[1:-1]],
+            total_stops=STOP_TYPES[self.route_stop_types[route_id]]
+        )
+    
+    # build a flight object view of one row
+    def flight(self, row: int) -> Flight:
+        return Flight(
+            airline=self.airlines[self.airline_ids[row]],
+            date_of_journey=self.dates[self.date_ids[row]],
+            route=self.route(self.route_ids[row]),
+            departure_time=_format_clock_time(self.departure_times[row]),
+            arrival_time=_format_clock_time(self.arrival_times[row]),
+            duration=self.duration_texts[self.duration_text_ids[row]],
+            additional_info=self.infos[self.info_ids[row]],
+            base_price=float(self.base_prices[row]),
+            duration_minutes=int(self.duration_minutes[row]),
+            # STOP_TYPES is ordered by stop count
+            stops_count=int(self.route_stop_types[self.route_ids[row]])
+        )
+    
+    # build a processed flight view of one row, once discounts are applied
+    def processed_flight(self, row: int) -> ProcessedFlight:
+        return ProcessedFlight(
+            original_flight=self.flight(row),
+            final_price=float(self.final_prices[row])
+        )
+    
+    # iterate processed flight views of every row
+    def processed_flights(self) -> Iterator[ProcessedFlight]:
+        for row in range(len(self)):
+            yield self.processed_flight(row)
+
+
+# turn an HHMM integer back into the HH:MM string parse_time produces
+def _format_clock_time(hhmm: int) -> str:
+    if hhmm < 0:
+        return "nan"
+    return f"{hhmm // 100:02d}:{hhmm % 100:02d}"
@@ -0,0 +1,157 @@
+# reusable ingest stages shared by process_data.py entry points
+# csv -> clean -> parse -> discount -> graph
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+import pandas as pd
+from .data_processor import FlightDataCleaner, RouteParser, DiscountEngine
+from .graph_builder import FlightGraph
+from .models import Discount, FlightTable
+from .stats import DiscountStats
+from .config import REALISTIC_DISCOUNTS, FLIGHT_CSV_DTYPES
+
+# rows per chunk in streaming mode, keeps peak memory to a few hundred MB
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# read the raw flight csv with the column schema: only the columns the pipeline
+# uses are loaded, typed as categoricals instead of one python string per cell
+def read_flight_csv(source, chunksize: int = None):
+    return pd.read_csv(
+        source,
+        usecols=lambda column: column in FLIGHT_CSV_DTYPES,
+        dtype=FLIGHT_CSV_DTYPES,
+        chunksize=chunksize
+    )
+
+
+# run clean, parse and discount stages on one block of raw rows
+def process_frame(df: pd.DataFrame, cleaner: FlightDataCleaner, parser: RouteParser,
+                  discount_engine: DiscountEngine) -> FlightTable:
+    cleaned_df, _ = cleaner.clean_dataset_vectorized(df)
+    flight_table, _ = parser.build_flight_table(cleaned_df)
+    return discount_engine.apply_discounts(flight_table)
+
+
+# build the flight graph by reading the csv in fixed-size chunks.
+# each chunk goes through every stage and is dropped before the next one is read,
+# and rows reach the graph in file order so the result matches a full load.
+# discount statistics are gathered on the way, no second pass over the flights
+def build_graph_streaming(input_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          discounts: List[Discount] = None) -> Tuple[FlightGraph, DiscountStats]:
+    cleaner = FlightDataCleaner(verbose=False)
+    parser = RouteParser(verbose=False)
+    discount_engine = DiscountEngine(discounts or REALISTIC_DISCOUNTS, verbose=False)
+    flight_graph = FlightGraph(verbose=False, lean=True)
+    
+    total_rows = 0
+    for chunk_number, chunk in enumerate(read_flight_csv(input_file, chunk_size), 1):
+        flight_table = process_frame(chunk, cleaner, parser, discount_engine)
+        # lean graph keeps only the rows of the cheapest flights, not the chunk
+        flight_graph.add_flights(flight_table, keep_flight_data=False)
+        total_rows += len(chunk)
+        print(f"  chunk {chunk_number}: {total_rows} rows processed")
+    
+    return flight_graph, discount_engine.stats
+
+
+# read-only view of a byte range of the csv with the header line in front,
+# so every shard parses as a standalone csv file
+class _ShardReader(io.RawIOBase):
+
+    def __init__(self, input_file: str, header: bytes, start: int, end: int):
+        self._file = open(input_file, 'rb')
+        self._file.seek(start)
+        self._pending = header          # header bytes not yet handed out
+        self._remaining = end - start   # shard bytes not yet handed out
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        # serve the header first, then the shard body
+        if self._pending:
+            size = min(len(buffer), len(self._pending))
+            buffer[:size] = self._pending[:size]
+            self._pending = self._pending[size:]
+            return size
+        
+        if self._remaining <= 0:
+            return 0
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+    
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+# split the csv body into newline-aligned byte ranges, one per shard.
+# records must not contain embedded newlines (true for the flight dumps)
+def split_csv_shards(input_file: str, shard_count: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    file_size = os.path.getsize(input_file)
+    
+    with open(input_file, 'rb') as f:
+        header = f.readline()
+        body_start = f.tell()
+        
+        # move each even split point forward to the start of the next line
+        boundaries = [body_start]
+        for shard in range(1, shard_count):
+            position = body_start + (file_size - body_start) * shard // shard_count
+            f.seek(max(position - 1, body_start))
+            f.readline()
+            boundaries.append(max(f.tell(), boundaries[-1]))
+        boundaries.append(file_size)
+    
+    # drop empty ranges when the file has fewer lines than shards
+    shards = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return header, shards
+
+
+# worker entry point: run every stage on one shard and return its partial graph
+# together with the shard's discount statistics
+def _process_shard(input_file: str, header: bytes, start: int, end: int,
+                   discounts: List[Discount], chunk_size: int) -> Tuple[FlightGraph, DiscountStats]:
+    cleaner = FlightDataCleaner(verbose=False)
+    parser = RouteParser(verbose=False)
+    discount_engine = DiscountEngine(discounts, verbose=False)
+    flight_graph = FlightGraph(verbose=False, lean=True)
+    
+    # stream the shard too so worker memory stays bounded
+    with io.BufferedReader(_ShardReader(input_file, header, start, end)) as shard_file:
+        for chunk in read_flight_csv(shard_file, chunk_size):
+            flight_table = process_frame(chunk, cleaner, parser, discount_engine)
+            flight_graph.add_flights(flight_table, keep_flight_data=False)
+    
+    return flight_graph, discount_engine.stats
+
+
+# build the flight graph with a pool of worker processes, one csv shard each.
+# partial graphs are merged in file order, so the result matches a single-process run.
+# per-shard discount statistics are merged alongside the graphs
+def build_graph_parallel(input_file: str, workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         discounts: List[Discount] = None) -> Tuple[FlightGraph, DiscountStats]:
+    discounts = discounts or REALISTIC_DISCOUNTS
+    header, shards = split_csv_shards(input_file, workers)
+    print(f"  split input into {len(shards)} shards")
+    
+    flight_graph = FlightGraph(verbose=False, lean=True)
+    discount_stats = DiscountStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_process_shard, input_file, header, start, end, discounts, chunk_size)
+            for start, end in shards
+        ]
+        # merge strictly in shard order to keep the cheapest-edge tie rule
+        for shard_number, future in enumerate(futures, 1):
+            shard_graph, shard_stats = future.result()
+            flight_graph.merge(shard_graph)
+            discount_stats.merge(shard_stats)
+            print(f"  shard {shard_number}/{len(shards)} merged")
+    
+    return flight_graph, discount_stats
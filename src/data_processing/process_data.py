@@ -1,73 +1,188 @@
 #!/usr/bin/env python3
 # simple flight data processing script
-# loads csv, cleans data, builds graph, exports 3 formats for algorithms
+# loads csv, cleans data, builds graph, exports the graph artifact for algorithms
 
 import os
 import sys
-import pandas as pd
+import time
+import argparse
+from typing import Tuple
 
 # Add src to Python path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from data_processing.data_processor import FlightDataCleaner, RouteParser, DiscountEngine
 from data_processing.graph_builder import FlightGraph, GraphExporter
+from data_processing.models import FlightTable
 from data_processing.config import REALISTIC_DISCOUNTS
+from data_processing.pipeline import (
+    build_graph_streaming, build_graph_parallel, read_flight_csv, DEFAULT_CHUNK_SIZE
+)
+from data_processing.incremental import IncrementalIngestor
+from data_processing.cache import FlightTableCache
+from data_processing.stats import DiscountStats
 
 
-def main():
-    # check command line arguments
-    if len(sys.argv) != 2:
-        print("Usage: python process_data.py <input_csv_file>")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_dir = "output"
-    
-    # validate input file exists
-    if not os.path.exists(input_file):
-        print(f"Error: Input file '{input_file}' not found")
-        sys.exit(1)
-    
-    # create output directory if needed
-    os.makedirs(output_dir, exist_ok=True)
-    
+# read command line options
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process flight csv into graph files")
+    parser.add_argument("input_file", help="raw flight csv file")
+    parser.add_argument("--output-dir", default="output", help="where graph files are written")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="stream the csv in chunks of this many rows")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split the csv into shards and process them in this many processes")
+    parser.add_argument("--delta", action="append", default=[], metavar="DELTA_CSV",
+                        help="apply a csv of added/removed/changed flights to the saved graph "
+                             "instead of rebuilding it (repeatable)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="where parsed flight tables are cached (default: OUTPUT_DIR/cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always clean and parse the csv, without reading or writing the cache")
+    parser.add_argument("--json", action="store_true",
+                        help="also write the legacy per-algorithm json files next to graph.bin")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="also write the dynamic programming edge list as graph_edge_list.ndjson, "
+                             "one edge per line")
+    return parser.parse_args()
+
+
+# load, clean and parse the csv into a flight table
+def parse_flights(input_file: str) -> FlightTable:
     # step 1: load raw csv data
     print("Loading flight data...")
-    df = pd.read_csv(input_file)
+    df = read_flight_csv(input_file)
     
     # step 2: clean and normalize the data
     print("Cleaning flight data...")
     cleaner = FlightDataCleaner()
-    cleaned_df, _ = cleaner.clean_dataset(df)
+    cleaned_df, _ = cleaner.clean_dataset_vectorized(df)
     
-    # step 3: convert dataframe rows to flight objects
+    # step 3: convert dataframe rows to a columnar flight table
     print("Parsing flight routes...")
     parser = RouteParser()
-    flights = parser.convert_to_flight_objects(cleaned_df)
+    flight_table, _ = parser.build_flight_table(cleaned_df)
+    return flight_table
+
+
+# load the whole csv and run every stage on it at once.
+# with a cache, an unchanged input skips straight to the discount stage
+def build_graph(input_file: str, cache: FlightTableCache = None) -> Tuple[FlightGraph, DiscountStats]:
+    start = time.perf_counter()
+    # hash the input once, a miss stores under the same key
+    cache_key = cache.cache_key(input_file) if cache else None
+    flight_table = cache.load(cache_key) if cache else None
+    if flight_table is not None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Loaded {len(flight_table)} parsed flights from cache in {elapsed_ms:.1f} ms")
+    else:
+        flight_table = parse_flights(input_file)
+        if cache:
+            print(f"Cached parsed flights in {cache.store(cache_key, flight_table)}")
     
     # step 4: apply realistic discounts to all flights
     print("Applying discounts...")
     discount_engine = DiscountEngine(REALISTIC_DISCOUNTS)
-    processed_flights = discount_engine.apply_discounts(flights)
+    flight_table = discount_engine.apply_discounts(flight_table)
     
     # step 5: build graph structure from processed flights
     print("Building flight graph...")
     flight_graph = FlightGraph()
-    flight_graph.add_flights(processed_flights)
-    
-    # step 6: export in the 3 formats needed by algorithms
+    flight_graph.add_flights(flight_table)
+    return flight_graph, discount_engine.stats
+
+
+# discount statistics gathered while the flights were priced
+def print_discount_summary(stats: DiscountStats) -> None:
+    summary = stats.summary()
+    percentiles = summary['savings_percentiles']
+    print(f"Discounted {summary['flights_with_discounts']} of {summary['total_flights']} flights "
+          f"({summary['discount_application_rate']:.1f}%), total savings ₹{summary['total_savings']:,.2f}")
+    print("Savings per flight: " + ", ".join(
+        f"p{percentile} ₹{value:,.2f}" for percentile, value in percentiles.items()
+    ))
+
+
+# write the graph artifact all algorithms read, plus the legacy json files if asked
+def export_graph(flight_graph: FlightGraph, output_dir: str, json_exports: bool = False,
+                 ndjson_edges: bool = False) -> None:
     print("Exporting graph data...")
     exporter = GraphExporter(flight_graph)
     
+    # one binary artifact, each algorithm memory-maps it through its own view
+    exporter.export_binary(os.path.join(output_dir, "graph.bin"))
+    # edge list streamed one record per line, readable with iter_edge_data
+    if ndjson_edges:
+        exporter.export_edge_list(os.path.join(output_dir, "graph_edge_list.ndjson"), ndjson=True)
+    if not json_exports:
+        return
+    
     # adjacency list format for dijkstra
     exporter.export_for_dijkstra(os.path.join(output_dir, "graph_dijkstra.json"))
-    # edge list format for bellman-ford  
+    # edge list format for bellman-ford
     exporter.export_for_bellman_ford(os.path.join(output_dir, "graph_bellman_ford.json"))
     # detailed edge data for dynamic programming
     exporter.export_edge_list(os.path.join(output_dir, "graph_edge_list.json"))
+
+
+# apply delta files on top of the saved graph state for the base csv
+def apply_deltas(input_file: str, delta_files: list, output_dir: str, json_exports: bool = False) -> None:
+    for delta_file in delta_files:
+        if not os.path.exists(delta_file):
+            print(f"Error: Delta file '{delta_file}' not found")
+            sys.exit(1)
+    
+    ingestor = IncrementalIngestor(output_dir, json_exports=json_exports)
+    ingestor.load_base(input_file)
+    for delta_file in delta_files:
+        ingestor.apply_delta_file(delta_file)
+    
+    written = ingestor.export()
+    print(f"Rewrote {len(written)} graph files: {', '.join(written) or 'none'}")
+    print(f"Processing complete! Files saved to: {output_dir}")
+
+
+def main():
+    args = parse_args()
+    input_file = args.input_file
+    output_dir = args.output_dir
+    
+    # validate input file exists
+    if not os.path.exists(input_file):
+        print(f"Error: Input file '{input_file}' not found")
+        sys.exit(1)
+    
+    # create output directory if needed
+    os.makedirs(output_dir, exist_ok=True)
+    
+    if args.delta:
+        # incremental mode: update saved graph state and rewrite only changed files
+        apply_deltas(input_file, args.delta, output_dir, args.json)
+        return
+    
+    if args.workers > 1:
+        # parallel mode: one csv shard per worker process, merged in file order
+        print(f"Processing flight data with {args.workers} workers...")
+        flight_graph, discount_stats = build_graph_parallel(input_file, args.workers,
+                                                            args.chunk_size or DEFAULT_CHUNK_SIZE)
+        flight_graph.print_summary()
+    elif args.chunk_size:
+        # streaming mode: memory stays flat regardless of input size
+        print(f"Streaming flight data in chunks of {args.chunk_size} rows...")
+        flight_graph, discount_stats = build_graph_streaming(input_file, args.chunk_size)
+        flight_graph.print_summary()
+    else:
+        cache = None
+        if not args.no_cache:
+            cache = FlightTableCache(args.cache_dir or os.path.join(output_dir, "cache"))
+        flight_graph, discount_stats = build_graph(input_file, cache)
+    print_discount_summary(discount_stats)
+    
+    # step 6: export the graph artifact needed by algorithms
+    export_graph(flight_graph, output_dir, args.json, args.ndjson)
     
     print(f"Processing complete! Files saved to: {output_dir}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
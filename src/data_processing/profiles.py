@@ -0,0 +1,170 @@
+# per-traveller pricing: one graph at base prices shared by everyone, plus a small
+# copy-on-write weight overlay per traveller profile holding only the edges its discounts change
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .graph_builder import GraphExporter
+from .models import Discount, FlightTable
+from .scenarios import ScenarioEvaluator
+from .config import TRAVELLER_PROFILES
+
+# overlays kept in memory before the least recently used one is dropped
+DEFAULT_OVERLAY_CACHE_SIZE = 128
+
+# name of the undiscounted scenario every overlay is compared against
+BASE_PROFILE = '__base__'
+
+
+# one profile's view of the base graph. only changed edges are stored: the dijkstra
+# format copies just the rows those edges touch, the edge lists read through to the base
+class ProfileOverlay:
+
+    def __init__(self, profile_id: Optional[str], store: 'ProfileStore',
+                 changed: Dict[Tuple[str, str], Dict]):
+        self.profile_id = profile_id
+        self.store = store
+        self.changed = changed      # (source, destination) -> edge in edge list format
+        self._dijkstra: Optional[Dict] = None
+        self._bellman_ford: Optional[Dict] = None
+        self._edge_list: Optional[OverlaidRows] = None
+    
+    # {source: {destination: weight}}, only rows of sources with changed edges are copied
+    def dijkstra_data(self) -> Dict:
+        if self._dijkstra is None:
+            base = self.store.base_dijkstra
+            view = dict(base)
+            for (source, dest), edge in self.changed.items():
+                if view[source] is base[source]:
+                    view[source] = dict(base[source])
+                view[source][dest] = edge['weight']
+            self._dijkstra = view
+        return self._dijkstra
+    
+    # {nodes: [...], edges: [[source, dest, weight], ...]}, edges read through to the base list
+    def bellman_ford_data(self) -> Dict:
+        if self._bellman_ford is None:
+            positions = self.store.edge_positions
+            overrides = {positions[(source, dest)]: [source, dest, edge['weight']]
+                         for (source, dest), edge in self.changed.items()}
+            self._bellman_ford = {
+                'nodes': self.store.base_bellman_ford['nodes'],
+                'edges': OverlaidRows(self.store.base_bellman_ford['edges'], overrides)
+            }
+        return self._bellman_ford
+    
+    # detailed edge list for dynamic programming, read through to the base list
+    def edge_list_data(self) -> Sequence[Dict]:
+        if self._edge_list is None:
+            positions = self.store.edge_positions
+            overrides = {positions[pair]: edge for pair, edge in self.changed.items()}
+            self._edge_list = OverlaidRows(self.store.base_edge_list, overrides)
+        return self._edge_list
+
+
+# read-only view of a base list with a few positions replaced. only the replaced
+# rows are stored, every other row is the base list's own object
+class OverlaidRows(Sequence):
+
+    def __init__(self, base: Sequence, overrides: Dict[int, Any]):
+        self.base = base
+        self.overrides = overrides      # position -> row served instead of the base row
+    
+    def __len__(self) -> int:
+        return len(self.base)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.overrides.get(index, self.base[index])
+    
+    def __iter__(self) -> Iterator:
+        if not self.overrides:
+            return iter(self.base)
+        return (self.overrides.get(position, row) for position, row in enumerate(self.base))
+
+
+# base-price graph plus an LRU cache of traveller profile overlays
+class ProfileStore:
+
+    def __init__(self, table: FlightTable, profiles: Dict[str, List[Discount]] = None,
+                 cache_size: int = DEFAULT_OVERLAY_CACHE_SIZE):
+        self.table = table
+        self.profiles = profiles if profiles is not None else TRAVELLER_PROFILES
+        self.cache_size = cache_size
+        self.evaluator = ScenarioEvaluator(table, verbose=False)
+        
+        # the shared graph carries base prices, no discounts at all
+        base = self.evaluator.evaluate({BASE_PROFILE: []})
+        self._base_segments = base.edge_segments[0]
+        self._base_weights = base.edge_weights[0]
+        exporter = GraphExporter(base.graph(BASE_PROFILE))
+        self.base_dijkstra = exporter.dijkstra_data()
+        self.base_bellman_ford = exporter.bellman_ford_data()
+        self.base_edge_list = exporter.edge_list_data()
+        self.edge_positions: Dict[Tuple[str, str], int] = {
+            (edge['source'], edge['destination']): position
+            for position, edge in enumerate(self.base_edge_list)
+        }
+        
+        self._base_overlay = ProfileOverlay(None, self, {})
+        self._overlays: 'OrderedDict[str, ProfileOverlay]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    # clean and parse a csv once and serve profiles over it
+    @classmethod
+    def from_csv(cls, input_file: str, profiles: Dict[str, List[Discount]] = None,
+                 cache_size: int = DEFAULT_OVERLAY_CACHE_SIZE) -> 'ProfileStore':
+        return cls(ScenarioEvaluator.from_csv(input_file, verbose=False).table, profiles, cache_size)
+    
+    # overlay for a profile id, None gives the undiscounted base graph
+    def overlay(self, profile_id: Optional[str] = None) -> ProfileOverlay:
+        if profile_id is None:
+            return self._base_overlay
+        if profile_id not in self.profiles:
+            raise KeyError(f"Unknown traveller profile '{profile_id}'")
+        
+        overlay = self._overlays.get(profile_id)
+        if overlay is not None:
+            self.hits += 1
+            self._overlays.move_to_end(profile_id)
+            return overlay
+        
+        self.misses += 1
+        overlay = self._build_overlay(profile_id)
+        self._overlays[profile_id] = overlay
+        if len(self._overlays) > self.cache_size:
+            self._overlays.popitem(last=False)
+        return overlay
+    
+    # price the profile's discounts and keep the edges that differ from the base graph
+    def _build_overlay(self, profile_id: str) -> ProfileOverlay:
+        results = self.evaluator.evaluate({profile_id: self.profiles[profile_id]})
+        edge_segments = results.edge_segments[0]
+        edge_weights = results.edge_weights[0]
+        final_prices = results.final_prices[0]
+        segments = results.segments
+        table = self.table
+        
+        changed = {}
+        differs = (edge_segments != self._base_segments) | (edge_weights != self._base_weights)
+        for pair in np.flatnonzero(differs).tolist():
+            segment = edge_segments[pair]
+            row = segments.rows[segment]
+            source = table.cities[segments.pair_source_ids[pair]].code
+            dest = table.cities[segments.pair_destination_ids[pair]].code
+            # same fields as GraphExporter.edge_list_data
+            changed[(source, dest)] = {
+                'source': source,
+                'destination': dest,
+                'weight': float(edge_weights[pair]),
+                'price': float(final_prices[row]),
+                'airline': table.airlines[table.airline_ids[row]],
+                'duration_minutes': int(table.duration_minutes[row]),
+                'stops': 0
+            }
+        return ProfileOverlay(profile_id, self, changed)
@@ -0,0 +1,108 @@
+# what-if pricing: evaluate many discount configurations against one parsed flight table.
+# the csv is cleaned and parsed once, every scenario is priced in one pass over the
+# shared arrays, and all scenario graphs share the same city-pair topology
+
+from dataclasses import dataclass, replace
+from typing import Dict, List
+import numpy as np
+from .data_processor import FlightDataCleaner, RouteParser, DiscountEngine
+from .discounts import CompiledDiscounts, best_discounts_for_scenarios
+from .graph_builder import (
+    FlightGraph, SegmentTable, explode_segments, segment_weights, cheapest_segments
+)
+from .models import Discount, FlightTable
+from .pipeline import read_flight_csv
+
+
+# prices and graph weights of every scenario, indexed by scenario name
+@dataclass
+class ScenarioResults:
+    names: List[str]                    # scenario names, in evaluation order
+    discounts: Dict[str, List[Discount]]
+    table: FlightTable                  # shared parsed flights
+    segments: SegmentTable              # shared topology: every city pair any flight covers
+    final_prices: np.ndarray            # float64 scenarios x flights
+    edge_segments: np.ndarray           # int64 scenarios x pairs, cheapest segment per pair
+    edge_weights: np.ndarray            # float64 scenarios x pairs, graph weight per pair
+    
+    # row of a scenario in the result arrays
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+    
+    # the shared table priced with one scenario's discounts (arrays are not copied)
+    def scenario_table(self, name: str) -> FlightTable:
+        return replace(self.table, final_prices=self.final_prices[self.index(name)])
+    
+    # get_discount_summary statistics for one scenario
+    def summary(self, name: str) -> Dict[str, any]:
+        engine = DiscountEngine(self.discounts[name], verbose=False)
+        return engine.get_discount_summary(self.scenario_table(name))
+    
+    # statistics for every scenario, by name
+    def summaries(self) -> Dict[str, Dict[str, any]]:
+        return {name: self.summary(name) for name in self.names}
+    
+    # build the flight graph of one scenario from its precomputed cheapest edges
+    def graph(self, name: str, verbose: bool = False) -> FlightGraph:
+        scenario = self.index(name)
+        flight_graph = FlightGraph(verbose=verbose)
+        flight_graph.add_cheapest_segments(
+            self.scenario_table(name), self.segments,
+            self.edge_segments[scenario], segment_weights(
+                self.table, self.segments, self.final_prices[scenario]
+            )
+        )
+        if verbose:
+            flight_graph.print_summary()
+        return flight_graph
+
+
+# prices many discount scenarios against one parsed flight table
+class ScenarioEvaluator:
+
+    def __init__(self, table: FlightTable, verbose: bool = True):
+        self.table = table
+        self.verbose = verbose
+        # topology does not depend on prices, so it is computed once for every scenario
+        self.segments = explode_segments(table)
+    
+    # clean and parse a csv once, ready for any number of scenarios
+    @classmethod
+    def from_csv(cls, input_file: str, verbose: bool = True) -> 'ScenarioEvaluator':
+        cleaned_df, _ = FlightDataCleaner(verbose=verbose).clean_dataset_vectorized(read_flight_csv(input_file))
+        table, _ = RouteParser(verbose=verbose).build_flight_table(cleaned_df)
+        return cls(table, verbose)
+    
+    # price every scenario and pick each scenario's cheapest flight per city pair
+    def evaluate(self, scenarios: Dict[str, List[Discount]]) -> ScenarioResults:
+        names = list(scenarios)
+        table = self.table
+        
+        # one pass over the flights prices every scenario
+        compiled = [CompiledDiscounts(scenarios[name]) for name in names]
+        best_discounts = best_discounts_for_scenarios(
+            compiled, table.airline_ids, table.airlines, table.base_prices
+        )
+        final_prices = np.maximum(table.base_prices * 0.5, table.base_prices - best_discounts)
+        
+        # same segments for every scenario, only the weights and the winners differ
+        edge_segments = np.empty((len(names), self.segments.pair_count), dtype=np.int64)
+        edge_weights = np.empty((len(names), self.segments.pair_count), dtype=np.float64)
+        for scenario in range(len(names)):
+            weights = segment_weights(table, self.segments, final_prices[scenario])
+            edge_segments[scenario] = cheapest_segments(self.segments, weights)
+            edge_weights[scenario] = weights[edge_segments[scenario]]
+        
+        if self.verbose:
+            print(f"Evaluated {len(names)} discount scenarios over {len(table)} flights "
+                  f"and {self.segments.pair_count} city pairs")
+        
+        return ScenarioResults(
+            names=names,
+            discounts=dict(scenarios),
+            table=table,
+            segments=self.segments,
+            final_prices=final_prices,
+            edge_segments=edge_segments,
+            edge_weights=edge_weights
+        )
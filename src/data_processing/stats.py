@@ -0,0 +1,123 @@
+# streaming discount statistics: counts, savings and savings percentiles gathered
+# while discounts are applied, mergeable across chunks and worker shards
+
+import math
+from typing import Dict, Iterable, List
+import numpy as np
+
+# percentiles reported in summaries
+SUMMARY_PERCENTILES: List[int] = [50, 90, 99]
+
+
+# mergeable quantile sketch with bounded relative error (the DDSketch layout).
+# values go into logarithmic buckets, so two sketches merge by adding bucket counts
+class QuantileSketch:
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}      # bucket index -> count, values > 0
+        self.negative: Dict[int, int] = {}      # bucket index of -value -> count, values < 0
+        self.zero_count = 0
+        self.count = 0
+    
+    # add a batch of values
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self._add_buckets(self.positive, values[values > 0])
+        self._add_buckets(self.negative, -values[values < 0])
+    
+    def _add_buckets(self, buckets: Dict[int, int], values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        indexes, counts = np.unique(np.ceil(np.log(values) / self._log_gamma), return_counts=True)
+        for index, count in zip(indexes.astype(np.int64).tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+    
+    # fold another sketch with the same accuracy into this one
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+    
+    # value at quantile q (0..1), within relative_accuracy of the exact answer
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        
+        # walk buckets from the most negative value to the largest positive one
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+    
+    # representative value of a bucket, equally close to both of its edges
+    def _bucket_value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+
+# running discount statistics, updated once per batch of priced flights
+class DiscountStats:
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.total_flights = 0
+        self.flights_with_discounts = 0
+        self.total_savings = 0.0
+        self.savings_sketch = QuantileSketch(relative_accuracy)
+    
+    # add a batch of flights given their base and final prices
+    def add(self, base_prices: np.ndarray, final_prices: np.ndarray) -> None:
+        savings = np.asarray(base_prices, dtype=np.float64) - np.asarray(final_prices, dtype=np.float64)
+        self.total_flights += len(savings)
+        self.flights_with_discounts += int(np.count_nonzero(savings > 0))
+        # keep adding in row order, same total as summing every flight one by one
+        self.total_savings = sum(savings.tolist(), self.total_savings)
+        self.savings_sketch.add(savings)
+    
+    # fold statistics from a later chunk or shard into these
+    def merge(self, other: 'DiscountStats') -> None:
+        self.total_flights += other.total_flights
+        self.flights_with_discounts += other.flights_with_discounts
+        self.total_savings += other.total_savings
+        self.savings_sketch.merge(other.savings_sketch)
+    
+    # combine several accumulators, in order
+    @classmethod
+    def merged(cls, parts: Iterable['DiscountStats']) -> 'DiscountStats':
+        stats = cls()
+        for part in parts:
+            stats.merge(part)
+        return stats
+    
+    # same keys as DiscountEngine.get_discount_summary, plus savings percentiles
+    def summary(self) -> Dict[str, any]:
+        total_flights = self.total_flights
+        return {
+            'total_flights': total_flights,
+            'flights_with_discounts': self.flights_with_discounts,
+            'discount_application_rate': (self.flights_with_discounts / total_flights * 100
+                                          if total_flights > 0 else 0),
+            'total_savings': self.total_savings,
+            'average_savings_per_flight': self.total_savings / total_flights if total_flights > 0 else 0,
+            'savings_percentiles': {
+                percentile: self.savings_sketch.quantile(percentile / 100)
+                for percentile in SUMMARY_PERCENTILES
+            }
+        }
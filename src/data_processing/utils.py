@@ -1,5 +1,7 @@
 import re
 from typing import Optional, Tuple, Dict, Any
+import numpy as np
+import pandas as pd
 
 
 # parse duration string like '2h 50m', '7h 25m', '19h' into total minutes
@@ -22,6 +24,17 @@ def parse_duration(duration_str: str) -> Optional[int]:
     return hours * 60 + minutes
 
 
+# duration of a flight record in minutes, parsing its duration string only
+# when cleaning did not already carry the parsed value on the record
+def flight_duration_minutes(flight) -> int:
+    duration_minutes = getattr(flight, 'duration_minutes', None)
+    if duration_minutes is not None:
+        return duration_minutes
+    if not flight.duration:
+        return 0
+    return parse_duration(flight.duration) or 0
+
+
 # parse time string and normalize format
 def parse_time(time_str: str) -> Optional[str]:
     # handle empty time strings
@@ -111,4 +124,132 @@ def calculate_weighted_price(base_price: float, duration_minutes: int) -> float:
     duration_penalty = duration_minutes * DURATION_PENALTY_PER_MINUTE
     
     # return total weighted cost (price + time penalty)
-    return base_price + duration_penalty
\ No newline at end of file
+    return base_price + duration_penalty
+
+# column-wise versions of the helpers above for whole-dataframe cleaning.
+# each one matches its per-row counterpart applied as `func(str(x))`
+
+# convert a column to strings the same way str(x) would (missing -> 'nan')
+def _as_str_column(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), 'nan').astype(str)
+
+
+# run a column parser over the distinct values only, then broadcast back.
+# flight columns are low-cardinality so this avoids most of the regex work.
+# categorical columns reuse their codes and stay categorical for string results
+def _parse_distinct(values: pd.Series, parse_column):
+    categorical = isinstance(values.dtype, pd.CategoricalDtype)
+    if categorical:
+        codes, uniques = _category_codes(values)
+    else:
+        codes, uniques = pd.factorize(_as_str_column(values))
+    parsed = parse_column(pd.Series(uniques, dtype=str))
+    if isinstance(parsed, tuple):
+        return tuple(_take_codes(part, codes, values.index, categorical) for part in parsed)
+    return _take_codes(parsed, codes, values.index, categorical)
+
+
+# codes of a categorical column plus the str() of each category,
+# missing values get one extra code whose value is 'nan'
+def _category_codes(values: pd.Series):
+    codes = values.cat.codes.to_numpy()
+    uniques = [str(category) for category in values.cat.categories]
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques.append('nan')
+    return codes, uniques
+
+
+# expand per-distinct-value results back to one value per row
+def _take_codes(parsed: pd.Series, codes: np.ndarray, index: pd.Index,
+                categorical: bool = False) -> pd.Series:
+    if categorical and not pd.api.types.is_numeric_dtype(parsed.dtype):
+        # parsed values can collide (e.g. two spellings of one city), so re-encode them
+        parsed_codes, categories = pd.factorize(parsed)
+        return pd.Series(pd.Categorical.from_codes(parsed_codes[codes], categories), index=index)
+    return pd.Series(parsed.to_numpy()[codes], index=index).astype(parsed.dtype)
+
+
+# parse a whole duration column into total minutes
+def parse_duration_column(durations: pd.Series) -> pd.Series:
+    minutes = _parse_distinct(durations, _parse_duration_column)
+    # match apply(): integer column unless some duration was empty
+    return minutes if minutes.isna().any() else minutes.astype('int64')
+
+
+def _parse_duration_column(durations: pd.Series) -> pd.Series:
+    durations = durations.str.strip()
+    
+    # pull out the first hours and minutes numbers on each row
+    hours = pd.to_numeric(durations.str.extract(r'(\d+)h', expand=False)).fillna(0)
+    minutes = pd.to_numeric(durations.str.extract(r'(\d+)m', expand=False)).fillna(0)
+    total_minutes = hours * 60 + minutes
+    
+    # empty strings have no duration at all
+    return total_minutes.where(durations != "").astype('float64')
+
+
+# parse a whole time column into standardized HH:MM strings
+def parse_time_column(times: pd.Series) -> pd.Series:
+    return _parse_distinct(times, _parse_time_column)
+
+
+def _parse_time_column(times: pd.Series) -> pd.Series:
+    times = times.str.strip()
+    parts = times.str.extract(r'(\d{1,2}):(\d{2})')
+    
+    # hour has at most 2 digits so zero padding gives the same as :02d
+    return parts[0].str.zfill(2) + ":" + parts[1]
+
+
+# normalize a whole city column using the mapping dictionary
+def normalize_city_column(cities: pd.Series, city_mappings: Dict[str, str]) -> pd.Series:
+    def normalize(distinct: pd.Series) -> pd.Series:
+        distinct = distinct.str.strip()
+        return distinct.map(city_mappings).fillna(distinct).astype(distinct.dtype)
+    return _parse_distinct(cities, normalize)
+
+
+# validate and parse a whole price column
+def validate_price_column(prices: pd.Series) -> pd.Series:
+    # numeric columns skip the string round trip entirely
+    if pd.api.types.is_numeric_dtype(prices):
+        numeric = prices.astype('float64')
+    elif isinstance(prices.dtype, pd.CategoricalDtype):
+        # parse each distinct price once
+        numeric = _parse_distinct(prices, _parse_price_column)
+    else:
+        numeric = pd.to_numeric(
+            _as_str_column(prices).str.replace(",", "", regex=False),
+            errors='coerce'
+        )
+    # keep only positive prices
+    return numeric.where(numeric > 0)
+
+
+def _parse_price_column(prices: pd.Series) -> pd.Series:
+    return pd.to_numeric(prices.str.replace(",", "", regex=False), errors='coerce').astype('float64')
+
+
+# parse a whole stops column into normalized names and counts
+def parse_stops_column(stops: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _parse_distinct(stops, _parse_stops_column)
+
+
+def _parse_stops_column(stops: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    stops = stops.str.strip().str.lower()
+    
+    # same precedence as parse_stops_info, anything else counts as non-stop
+    one_stop = ~stops.str.contains("non-stop", regex=False) & stops.str.contains("1 stop", regex=False)
+    two_stops = (~stops.str.contains("non-stop", regex=False) & ~one_stop
+                 & stops.str.contains("2 stops", regex=False))
+    
+    names = np.select([one_stop, two_stops], ["1 stop", "2 stops"], default="non-stop")
+    counts = np.select([one_stop, two_stops], [1, 2], default=0)
+    return (pd.Series(names, index=stops.index).astype(stops.dtype),
+            pd.Series(counts, index=stops.index, dtype='int64'))
+
+
+# clean a whole airline column
+def clean_airline_column(airlines: pd.Series) -> pd.Series:
+    return _parse_distinct(airlines, lambda distinct: distinct.str.strip())